@@ -5,6 +5,17 @@ import sounddevice as sd
 import numpy as np
 import time
 import os
+import threading
+import queue
+import bus
+import tracing
+import readiness
+from scheduler import SchedulerBusy, TranscriptionScheduler
+from streaming import StreamingTranscriber
+from audio_buffer import AudioBuffer
+from decoding import DEFAULT_PROFILE, DecodingPolicy
+from vad import VoiceActivityDetector
+from session_store import SAMPLE_RATE as STORE_SAMPLE_RATE, SessionStore, sessions_enabled
 
 # --- Load Custom & Tailwind CSS ---
 def load_css():
@@ -30,32 +41,142 @@ def load_css():
 
 # ----------------- Parameters (CPU Optimized) -----------------
 SAMPLE_RATE = 16000
-CHUNK_DURATION = 0.5
+CHUNK_DURATION = 0.1      # microphone block; short so speech (and barge-in) is noticed quickly
 CHUNK_SIZE = int(SAMPLE_RATE * CHUNK_DURATION)
 MODEL_SIZE = "tiny.en"
 DEVICE = "cpu"
-BEAM_SIZE = 15
+DECODING_PROFILE = DEFAULT_PROFILE  # fast / balanced / accurate / legacy (beam 15); or COACH_DECODING_PROFILE
 TEMPERATURE = 0.0
 COMPUTE_TYPE = "int8"
+STREAMING = True          # transcribe while the candidate is still speaking
+STREAM_INTERVAL = 1.0     # seconds between partial decodes
+STREAM_WINDOW = 15.0      # max seconds of uncommitted audio before force-committing
+WHISPER_NUM_WORKERS = 2   # decodes that may run in parallel (one per concurrent session)
+WHISPER_CPU_THREADS = 4   # intra-op threads per decode
+if os.environ.get("COACH_WHISPER_THREADS"):
+    # A thread budget for the whole stage (supervisor.py): CTranslate2 runs workers x threads
+    WHISPER_CPU_THREADS = max(1, int(os.environ["COACH_WHISPER_THREADS"]) // WHISPER_NUM_WORKERS)
+MAX_BATCH = 4             # pending requests dispatched together
+MAX_QUEUE = 16            # pending requests before new ones are rejected
+MAX_RECORDING_SECONDS = 3600.0  # capture limit per answer; older audio is dropped past this
+VAD_ENABLED = True        # drop silence before it reaches Whisper
+VAD_KEEP_SILENCE = 0.3    # seconds of each pause kept so words don't run together
+# End the answer after this long a pause; off by default, since thinking pauses run longer (COACH_AUTO_STOP=5)
+AUTO_STOP_SILENCE = float(os.environ.get("COACH_AUTO_STOP", "0"))
+BARGE_IN = True           # silence the interviewer as soon as the candidate starts speaking
+ENDPOINT_POLL = 0.25      # seconds between pause checks
+SAVE_SESSIONS = sessions_enabled()  # keep every turn for Save & Review (COACH_SAVE_SESSIONS=0 to turn off)
+REVIEW_PAGE_SIZE = 20     # sessions per page in the review view
+SEND_TIMEOUT = 2.0        # seconds to reach file_chat.py before giving up on this answer
 
 # ----------------- Initialize model -----------------
-print("Loading Whisper model...")
-try:
-    model = WhisperModel(MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE)
-    print("Whisper model loaded successfully.")
-except Exception as e:
-    print(f"Error loading Whisper model: {e}")
-    model = None
-
-# ----------------- Global state -----------------
-recording = False
-audio_buffer = []
+model = None
+scheduler = None   # one scheduler shared by every browser session
+models_ready = threading.Event()
+
+def load_models():
+    """Load and warm up Whisper in the background while the UI is being built."""
+    global model, scheduler
+    print("Loading Whisper model...")
+    start = time.perf_counter()
+    try:
+        loaded = WhisperModel(
+            MODEL_SIZE, device=DEVICE, compute_type=COMPUTE_TYPE,
+            cpu_threads=WHISPER_CPU_THREADS, num_workers=WHISPER_NUM_WORKERS
+        )
+        load_time = time.perf_counter() - start
+        print("Whisper model loaded successfully.")
+
+        # One short decode so the first real turn doesn't pay for lazy initialization
+        start = time.perf_counter()
+        warmup_audio = np.random.default_rng(0).normal(0, 0.01, SAMPLE_RATE).astype(np.float32)
+        policy = DecodingPolicy(DECODING_PROFILE, temperature=TEMPERATURE, sample_rate=SAMPLE_RATE)
+        policy.transcribe(loaded, warmup_audio)
+        warmup_time = time.perf_counter() - start
+
+        model = loaded
+        scheduler = TranscriptionScheduler(
+            model, policy=policy, num_workers=WHISPER_NUM_WORKERS, max_batch=MAX_BATCH, max_queue=MAX_QUEUE
+        )
+        print(f"Decoding profile: {DECODING_PROFILE}")
+        readiness.mark_ready("app", load=load_time, warmup=warmup_time)
+    except Exception as e:
+        print(f"Error loading Whisper model: {e}")
+    finally:
+        models_ready.set()
+
+threading.Thread(target=load_models, daemon=True).start()
+
+# ----------------- Downstream channel -----------------
+# Short connect timeout: a user is waiting on the button while file_chat.py may be restarting
+transcript_channel = bus.open_sender(bus.TRANSCRIPT, "input.txt", connect_timeout=SEND_TIMEOUT)
+
+# ----------------- Barge-in -----------------
+barge_in_times = queue.SimpleQueue()   # speech onsets, filled from the audio callback
+
+def send_barge_ins():
+    """Tell tts.py to stop talking (off the audio thread, since sending may block)."""
+    control = bus.BusSender(bus.CONTROL, connect_timeout=1.0)
+    while True:
+        detected_at = barge_in_times.get()
+        try:
+            control.send(bus.CONTROL, "cancel", t=detected_at)
+        except (OSError, EOFError):
+            pass   # tts.py isn't listening
+
+if BARGE_IN and VAD_ENABLED and bus.bus_enabled():
+    threading.Thread(target=send_barge_ins, daemon=True).start()
+
+# ----------------- Session history -----------------
+store = SessionStore() if SAVE_SESSIONS else None
+
+# ----------------- Per-session state -----------------
+class RecordingSession:
+    """Audio and transcription state for one browser tab."""
+
+    def __init__(self):
+        self.recording = False
+        self.started_at = 0.0
+        self.session_id = None   # SessionStore id, created with the first saved turn
+        self.barged_in = False   # a barge-in was sent for this answer
+        self.audio_buffer = AudioBuffer(SAMPLE_RATE, max_seconds=MAX_RECORDING_SECONDS)
+        self.transcriber = StreamingTranscriber(
+            None, sample_rate=SAMPLE_RATE, window=STREAM_WINDOW
+        )
+        self.vad = VoiceActivityDetector(
+            SAMPLE_RATE, keep_silence=VAD_KEEP_SILENCE, endpoint_silence=AUTO_STOP_SILENCE
+        )
+
+    def capture(self, block):
+        """Store a microphone block, minus long silences."""
+        if VAD_ENABLED:
+            block, speech = self.vad.process(block)
+            if speech and BARGE_IN and not self.barged_in:
+                self.barged_in = True
+                barge_in_times.put(time.time())
+        if len(block):
+            self.audio_buffer.write(block)
+
+sessions = {}
+sessions_lock = threading.Lock()
+
+def get_session(request):
+    with sessions_lock:
+        session = sessions.get(request.session_hash)
+        if session is None:
+            session = sessions[request.session_hash] = RecordingSession()
+        return session
+
+def drop_session(request: gr.Request):
+    with sessions_lock:
+        sessions.pop(request.session_hash, None)
 
 # ----------------- Audio callback -----------------
 def callback(indata, frames, time_info, status):
-    global recording
-    if recording:
-        audio_buffer.append(indata[:, 0].astype(np.float32))
+    with sessions_lock:
+        active = [s for s in sessions.values() if s.recording]
+    for session in active:
+        session.capture(indata[:, 0])
 
 # ----------------- UI Helper Functions -----------------
 def create_status_display(status_text):
@@ -67,38 +188,104 @@ def create_status_display(status_text):
     """
 
 # ----------------- Core Transcription Logic -----------------
-def start_recording():
-    global recording, audio_buffer
-    audio_buffer = []
-    recording = True
-    return create_status_display("Recording..."), "..."
-
-def stop_recording():
-    global recording, audio_buffer
-    if not recording: 
+def start_recording(request: gr.Request):
+    session = get_session(request)
+    session.audio_buffer.clear()
+    session.transcriber.model = scheduler
+    session.transcriber.reset()
+    session.vad.reset()
+    session.barged_in = False
+    session.started_at = time.perf_counter()
+    session.recording = True
+    yield create_status_display("Recording..."), "..."
+
+    # Push partial transcripts while recording and end the answer on a long pause;
+    # stop_recording decodes the tail
+    last_partial = time.perf_counter()
+    while session.recording:
+        time.sleep(ENDPOINT_POLL)
+        if VAD_ENABLED and session.vad.endpoint and session.recording:
+            print("🔚 Pause detected, finishing the answer")
+            yield stop_recording(request)
+            return
+
+        if not STREAMING or scheduler is None or time.perf_counter() - last_partial < STREAM_INTERVAL:
+            continue
+        last_partial = time.perf_counter()
+        buffer = session.audio_buffer
+        if not session.recording or not len(buffer):
+            continue
+        try:
+            partial = session.transcriber.update(buffer.view(), offset=buffer.dropped)
+        except SchedulerBusy:
+            continue  # skip this partial; the final pass still covers it
+        if partial is None or not session.recording:
+            break
+        yield create_status_display("Recording..."), partial or "..."
+
+def stop_recording(request: gr.Request):
+    session = get_session(request)
+    if not session.recording: 
         return create_status_display("Not Recording"), ""
     
-    recording = False
+    session.recording = False
+    turn = tracing.new_trace_id()
+    bus.emit_event("stop", turn)
+    capture_time = time.perf_counter() - session.started_at
+    tracing.record("capture", capture_time, turn)
+    if VAD_ENABLED:
+        tracing.record("vad_dropped_seconds", session.vad.dropped_samples / SAMPLE_RATE, turn)
     sd.sleep(int(CHUNK_DURATION * 1000))
     
-    if not audio_buffer: 
+    buffer = session.audio_buffer
+    if not len(buffer): 
         return create_status_display("No Audio"), ""
 
-    audio_data = np.concatenate(audio_buffer)
-    audio_buffer = []
+    audio_data = buffer.view()
+    if buffer.overflow_samples:
+        tracing.record("capture_overflow_seconds", buffer.overflow_seconds, turn)
+        print(f"⚠️ Capture overflow: dropped {buffer.overflow_seconds:.1f}s of audio "
+              f"({buffer.overflow_events} events, limit {MAX_RECORDING_SECONDS:.0f}s)")
     
-    if model is None: 
+    if scheduler is None: 
         return create_status_display("Model Error"), ""
 
     print("Transcribing...")
-    segments, _ = model.transcribe(audio_data, beam_size=BEAM_SIZE, temperature=TEMPERATURE)
-    transcription_text = "\n".join(segment.text for segment in segments)
+    start = time.perf_counter()
+    try:
+        with tracing.span("transcribe", turn, audio_seconds=len(audio_data) / SAMPLE_RATE):
+            if STREAMING:
+                transcription_text = session.transcriber.finalize(audio_data, offset=buffer.dropped)
+            else:
+                segments, _ = scheduler.transcribe(audio_data)
+                transcription_text = "\n".join(segment.text for segment in segments)
+    except SchedulerBusy:
+        return create_status_display("Server Busy - Try Again"), ""
 
-    filename = "input.txt"
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(transcription_text)
+    transcribe_time = time.perf_counter() - start
+
+    bus.emit_event("transcribed", turn)
+    status = "Complete"
+    try:
+        transcript_channel.send(bus.TRANSCRIPT, transcription_text, turn=turn)
+    except (OSError, EOFError) as e:
+        # Still show and keep the answer; only the interviewer's reply is missing
+        print(f"⚠️ Could not reach the interviewer: {e}")
+        status = "Interviewer Unavailable - Try Again"
+    save_turn(session, turn, transcription_text, audio_data, capture=capture_time, transcribe=transcribe_time)
     
-    return create_status_display("Complete"), transcription_text
+    return create_status_display(status), transcription_text
+
+def save_turn(session, turn, text, audio, **timings):
+    """Append the answer to the session history (after it has been sent on, off the critical path)."""
+    if store is None or not text:
+        return
+    try:
+        if session.session_id is None:
+            session.session_id = store.start_session()
+        store.add_turn(session.session_id, text, audio, turn=turn, **timings)
+    except Exception as e:
+        print(f"⚠️ Could not save the turn: {e}")
 
 # ----------------- Page Navigation -----------------
 def navigate_to_interview():
@@ -108,17 +295,20 @@ def navigate_to_interview():
         feedback_page: gr.update(visible=False)
     }
 
-def navigate_to_feedback():
-    global recording
-    recording = False
+def navigate_to_feedback(request: gr.Request):
+    get_session(request).recording = False
     return {
         landing_page: gr.update(visible=False), 
         interview_page: gr.update(visible=False), 
         feedback_page: gr.update(visible=True)
     }
 
-def submit_feedback_and_reset(rating, feedback_text):
+def submit_feedback_and_reset(rating, feedback_text, request: gr.Request):
     print(f"--- Feedback ---\nRating: {rating}\nComments: {feedback_text}\n----------------")
+    session = get_session(request)
+    if store is not None and session.session_id is not None:
+        store.finish_session(session.session_id, rating=rating, feedback=feedback_text)
+    session.session_id = None   # the next interview is a new session
     return {
         feedback_page: gr.update(visible=False), 
         landing_page: gr.update(visible=True), 
@@ -127,16 +317,75 @@ def submit_feedback_and_reset(rating, feedback_text):
         feedback_comments: gr.update(value="")
     }
 
+# ----------------- Session Review -----------------
+def review_page_data(page):
+    """Table rows and session choices for one page of history (only that page is read)."""
+    if store is None:
+        return [], "Session saving is turned off.", gr.update(choices=[], value=None), 0
+    pages = max(1, -(-store.count_sessions() // REVIEW_PAGE_SIZE))
+    page = min(max(page, 0), pages - 1)
+    rows = []
+    for s in store.list_sessions(page, REVIEW_PAGE_SIZE):
+        started = time.strftime("%Y-%m-%d %H:%M", time.localtime(s["started_at"]))
+        rows.append([s["id"], started, s["turns"], round(s["audio_seconds"] / 60, 1), s["rating"] or ""])
+    choices = [(f"#{r[0]} - {r[1]}", r[0]) for r in rows]
+    return rows, f"Page {page + 1} of {pages}", gr.update(choices=choices, value=None), page
+
+def show_session(session_id):
+    if store is None or session_id is None:
+        return "", gr.update(choices=[], value=None), None
+    turns = store.get_turns(session_id)
+    lines = []
+    for t in turns:
+        timings = ", ".join(f"{k} {v:.1f}s" for k, v in t["timings"].items())
+        lines.append(f"**Answer {t['idx'] + 1}** ({timings})\n\n{t['transcript']}\n\n"
+                     f"*Interviewer:* {t['reply'] or '(no reply recorded)'}")
+    choices = [(f"Answer {t['idx'] + 1}", t["idx"]) for t in turns]
+    return "\n\n---\n\n".join(lines) or "No turns.", gr.update(choices=choices, value=None), None
+
+def play_turn(session_id, idx):
+    """Read one answer's audio from disk, only when it is asked for."""
+    if store is None or session_id is None or idx is None:
+        return None
+    audio = store.turn_audio(session_id, idx)
+    return None if audio is None else (STORE_SAMPLE_RATE, np.asarray(audio))
+
+def navigate_to_review():
+    rows, label, picker, page = review_page_data(0)
+    return {
+        landing_page: gr.update(visible=False),
+        review_page: gr.update(visible=True),
+        sessions_table: rows,
+        review_page_label: label,
+        session_picker: picker,
+        review_page_index: page,
+    }
+
+def navigate_to_landing():
+    return {landing_page: gr.update(visible=True), review_page: gr.update(visible=False)}
+
+def check_ready():
+    """Enable recording once Whisper, Gemini and TTS have all reported ready."""
+    if models_ready.is_set() and scheduler is None:
+        return gr.update(interactive=False), create_status_display("Model Error"), gr.Timer(active=False)
+    if scheduler is None or not readiness.pipeline_ready():
+        waiting = [s for s in readiness.STAGES if s not in readiness.status()] if readiness.ready_dir() else ["app"]
+        return gr.update(interactive=False), create_status_display(f"Loading: {', '.join(waiting)}..."), gr.Timer(active=True)
+    return gr.update(interactive=True), create_status_display("Idle"), gr.Timer(active=False)
+
 def clear_transcription():
     return create_status_display("Idle"), ""
 
 # ----------------- Start audio stream -----------------
-try:
-    stream = sd.InputStream(channels=1, samplerate=SAMPLE_RATE, callback=callback, blocksize=CHUNK_SIZE)
-    stream.start()
-    print("Audio stream started.")
-except Exception as e:
-    print(f"Error initializing audio stream: {e}")
+def start_audio_stream():
+    """Open the microphone; bench_pipeline.py feeds callback() from WAV files instead."""
+    try:
+        stream = sd.InputStream(channels=1, samplerate=SAMPLE_RATE, callback=callback, blocksize=CHUNK_SIZE)
+        stream.start()
+        print("Audio stream started.")
+        return stream
+    except Exception as e:
+        print(f"Error initializing audio stream: {e}")
 
 # ----------------- Gradio Interface -----------------
 with gr.Blocks(css=load_css(), elem_classes="min-h-screen") as demo:
@@ -167,6 +416,10 @@ with gr.Blocks(css=load_css(), elem_classes="min-h-screen") as demo:
                 "🚀 Try the Interview Experience", 
                 elem_classes="px-8 py-3 rounded-full text-base font-bold text-white bg-purple-600 hover:bg-purple-700 transition-all transform hover:scale-105 shadow-lg shadow-purple-900/50"
             )
+            review_sessions_btn = gr.Button(
+                "📚 Review Past Sessions",
+                elem_classes="px-8 py-3 rounded-full text-base font-bold text-white bg-neutral-700 hover:bg-neutral-600 transition-all transform hover:scale-105 shadow-lg"
+            )
 
         # Bento Grid - Feature Cards
         gr.HTML("""
@@ -220,9 +473,9 @@ with gr.Blocks(css=load_css(), elem_classes="min-h-screen") as demo:
                     <p class="text-neutral-400 mt-2">Manage your recording session here.</p>
                 </div>
                 """)
-                status = gr.HTML(create_status_display("Idle"))
+                status = gr.HTML(create_status_display("Loading models..."))
                 with gr.Column(elem_classes="p-6 bg-neutral-900/80 border border-neutral-800 rounded-2xl backdrop-blur-sm space-y-4"):
-                    start_button = gr.Button("▶️ Start Recording", elem_classes="w-full bg-green-600 hover:bg-green-700 text-white font-bold py-3 px-4 rounded-lg text-xl shadow-lg transform hover:scale-105 transition-all")
+                    start_button = gr.Button("▶️ Start Recording", interactive=False, elem_classes="w-full bg-green-600 hover:bg-green-700 text-white font-bold py-3 px-4 rounded-lg text-xl shadow-lg transform hover:scale-105 transition-all")
                     stop_button = gr.Button("⏹️ Stop Recording", elem_classes="w-full bg-red-600 hover:bg-red-700 text-white font-bold py-3 px-4 rounded-lg text-xl shadow-lg transform hover:scale-105 transition-all")
                     clear_button = gr.Button("🗑️ Clear Transcript", elem_classes="w-full bg-neutral-600 hover:bg-neutral-700 text-white font-bold py-3 px-4 rounded-lg text-xl shadow-lg transform hover:scale-105 transition-all")
                 end_interview_btn = gr.Button("🏁 End Interview & Give Feedback", elem_classes="w-full bg-purple-600 hover:bg-purple-700 text-white font-bold py-4 rounded-lg text-xl shadow-lg transform hover:scale-105 transition-all")
@@ -269,6 +522,32 @@ with gr.Blocks(css=load_css(), elem_classes="min-h-screen") as demo:
                 elem_classes="mt-6 w-full bg-purple-600 hover:bg-purple-700 text-white font-bold py-3 rounded-lg text-xl shadow-lg transform hover:scale-105 transition-all"
             )
 
+    # ============================================================
+    # === 4. REVIEW PAGE ===
+    # ============================================================
+    with gr.Column(visible=False, elem_classes="w-full min-h-screen p-4 animate-in fade-in duration-500") as review_page:
+        with gr.Column(elem_classes="max-w-5xl w-full mx-auto p-8 bg-neutral-900/80 border border-neutral-800 rounded-2xl backdrop-blur-sm space-y-4"):
+            gr.Markdown("""
+            <h2 class="text-3xl font-bold text-white">Your Practice Sessions</h2>
+            <p class="text-neutral-400 mt-2">Pick a session to read your answers and the interviewer's replies.</p>
+            """)
+            sessions_table = gr.Dataframe(
+                headers=["#", "Started", "Answers", "Minutes", "Rating"],
+                interactive=False, wrap=True
+            )
+            review_page_index = gr.State(0)
+            with gr.Row():
+                prev_page_btn = gr.Button("◀ Newer", elem_classes="bg-neutral-700 hover:bg-neutral-600 text-white rounded-lg")
+                review_page_label = gr.Markdown("")
+                next_page_btn = gr.Button("Older ▶", elem_classes="bg-neutral-700 hover:bg-neutral-600 text-white rounded-lg")
+            session_picker = gr.Dropdown(label="Session", choices=[])
+            session_view = gr.Markdown("")
+            turn_picker = gr.Dropdown(label="Listen to an answer", choices=[])
+            turn_audio = gr.Audio(label="Recorded answer", interactive=False)
+            back_to_landing_btn = gr.Button(
+                "⬅ Back", elem_classes="w-full bg-purple-600 hover:bg-purple-700 text-white font-bold py-3 rounded-lg text-xl"
+            )
+
     # --- Event Handlers (Unchanged) ---
     try_interview_btn.click(
         fn=navigate_to_interview, 
@@ -285,9 +564,28 @@ with gr.Blocks(css=load_css(), elem_classes="min-h-screen") as demo:
         inputs=[feedback_rating, feedback_comments], 
         outputs=[landing_page, interview_page, feedback_page, feedback_rating, feedback_comments]
     )
-    start_button.click(fn=start_recording, outputs=[status, transcription_output])
-    stop_button.click(fn=stop_recording, outputs=[status, transcription_output])
+    review_outputs = [sessions_table, review_page_label, session_picker, review_page_index]
+    review_sessions_btn.click(
+        fn=navigate_to_review,
+        outputs=[landing_page, review_page] + review_outputs
+    )
+    back_to_landing_btn.click(fn=navigate_to_landing, outputs=[landing_page, review_page])
+    prev_page_btn.click(fn=lambda page: review_page_data(page - 1), inputs=review_page_index, outputs=review_outputs)
+    next_page_btn.click(fn=lambda page: review_page_data(page + 1), inputs=review_page_index, outputs=review_outputs)
+    session_picker.change(fn=show_session, inputs=session_picker, outputs=[session_view, turn_picker, turn_audio])
+    turn_picker.change(fn=play_turn, inputs=[session_picker, turn_picker], outputs=turn_audio)
+    # No per-event concurrency limit: the scheduler bounds the transcription queue
+    start_button.click(fn=start_recording, outputs=[status, transcription_output], concurrency_limit=None)
+    stop_button.click(fn=stop_recording, outputs=[status, transcription_output], concurrency_limit=None)
     clear_button.click(fn=clear_transcription, outputs=[status, transcription_output])
+    demo.unload(drop_session)
+
+    # Hold "Start Recording" until the whole pipeline is warmed up
+    ready_timer = gr.Timer(1.0)
+    ready_timer.tick(fn=check_ready, outputs=[start_button, status, ready_timer])
+    demo.load(fn=check_ready, outputs=[start_button, status, ready_timer])
 
 if __name__ == "__main__":
+    tracing.init("app")
+    stream = start_audio_stream()
     demo.launch()
@@ -0,0 +1,106 @@
+# audio_buffer.py
+import threading
+
+import numpy as np
+
+
+class AudioBuffer:
+    """Preallocated float32 capture buffer with a hard size limit.
+
+    The backing array is allocated once, `max_seconds` plus some headroom
+    (the OS only commits pages as they are written). Blocks are copied
+    straight in; past the limit the oldest `drop_fraction` of the recording
+    is discarded by moving the start forward and counted in
+    `overflow_samples`. Only when a long recording reaches the end of the
+    array does a background thread move it into a fresh one, so write(),
+    which runs in the audio callback, copies nothing but its block.
+
+    view() returns a zero-copy view of the recording, valid until the next
+    clear(): writes only append past the current end, drops only move the
+    start, and a compaction leaves the old array to the views still on it.
+    """
+
+    def __init__(self, sample_rate=16000, max_seconds=3600.0, drop_fraction=0.1):
+        self.sample_rate = sample_rate
+        self.max_samples = int(max_seconds * sample_rate)
+        self.drop_samples = max(int(self.max_samples * drop_fraction), 1)
+        self.capacity = self.max_samples + 2 * self.drop_samples
+        self.overflow_samples = 0   # total samples discarded because of the limit
+        self.overflow_events = 0
+        self.compactions = 0
+        self._data = np.empty(self.capacity, dtype=np.float32)
+        self._compacting = False
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Start a new, empty recording (reusing the array)."""
+        with self._lock:
+            self._start = 0
+            self._end = 0
+            self._generation += 1
+            self.dropped = 0   # samples removed from the front of this recording
+
+    def write(self, block):
+        """Append a 1-D block of samples (any numeric dtype)."""
+        block = block[-self.max_samples:]
+        n = len(block)
+        with self._lock:
+            excess = self._end - self._start + n - self.max_samples
+            if excess > 0:
+                drop = min(max(excess, self.drop_samples), self._end - self._start)
+                self._start += drop
+                self.dropped += drop
+                self.overflow_samples += drop
+                self.overflow_events += 1
+            if self._end + n > len(self._data):
+                self._compact_now()   # the background compaction didn't finish in time
+            np.copyto(self._data[self._end:self._end + n], block, casting="unsafe")
+            self._end += n
+            if self._end >= len(self._data) - self.drop_samples and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self._compact, daemon=True).start()
+
+    def _compact_now(self):
+        data = np.empty(self.capacity, dtype=np.float32)
+        data[:self._end - self._start] = self._data[self._start:self._end]
+        self._data = data
+        self._end -= self._start
+        self._start = 0
+        self.compactions += 1
+
+    def _compact(self):
+        """Move the recording to the front of a fresh array, off the audio thread."""
+        try:
+            data = np.empty(self.capacity, dtype=np.float32)
+            with self._lock:
+                source, start, end, generation = self._data, self._start, self._end, self._generation
+            # Samples before `end` don't change until clear(), so copy them without the lock
+            data[:end - start] = source[start:end]
+            with self._lock:
+                if self._data is not source or self._generation != generation:
+                    return
+                data[end - start:self._end - start] = source[end:self._end]   # written meanwhile
+                self._data = data
+                self._start -= start
+                self._end -= start
+                self.compactions += 1
+        finally:
+            self._compacting = False
+
+    def view(self):
+        """Zero-copy view of the samples recorded so far."""
+        with self._lock:
+            return self._data[self._start:self._end]
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def seconds(self):
+        return len(self) / self.sample_rate
+
+    @property
+    def overflow_seconds(self):
+        return self.overflow_samples / self.sample_rate
@@ -0,0 +1,161 @@
+# batch.py
+"""Transcribe (and optionally re-interview) a directory of recorded answers.
+
+Files are spread over a pool of processes, each with its own WhisperModel
+and a fixed number of CPU threads, so throughput scales with cores instead
+of every decode fighting over all of them. Results are appended to a JSONL
+file as they finish; re-running the same command skips files that are
+already done, so an interrupted run picks up where it stopped.
+
+    python batch.py recordings/ --out results.jsonl
+    python batch.py recordings/ --workers 8 --threads 1 --interview
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from decoding import PROFILES
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm")
+SAMPLE_RATE = 16000
+
+_model = None
+_policy = None
+_interview = False
+
+
+def _init_worker(model_size, threads, profile, interview):
+    """Load one model per worker process."""
+    global _model, _policy, _interview
+    from faster_whisper import WhisperModel
+    from decoding import DecodingPolicy
+
+    _model = WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=threads, num_workers=1)
+    _policy = DecodingPolicy(profile, sample_rate=SAMPLE_RATE)
+    _interview = interview
+
+
+def _interviewer_reply(transcript):
+    """Run the transcript through file_chat.py's interviewer prompt in a fresh conversation."""
+    import file_chat
+    from context import ManagedChat
+
+    chat = ManagedChat(file_chat.client, model=file_chat.chat.model, config=file_chat.chat.config)
+    return file_chat.clean_text(chat.send_message(transcript).text or "")
+
+
+def process_file(path):
+    from faster_whisper import decode_audio
+
+    result = {"file": path}
+    try:
+        audio = decode_audio(path, sampling_rate=SAMPLE_RATE)
+        start = time.perf_counter()
+        segments, _ = _policy.transcribe(_model, audio)
+        elapsed = time.perf_counter() - start
+        result["transcript"] = " ".join(s.text.strip() for s in segments)
+        result["audio_seconds"] = round(len(audio) / SAMPLE_RATE, 2)
+        result["decode_seconds"] = round(elapsed, 3)
+        result["rtf"] = round(elapsed / max(result["audio_seconds"], 1e-6), 4)
+        if _interview and result["transcript"]:
+            result["reply"] = _interviewer_reply(result["transcript"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def find_audio(directory):
+    paths = []
+    for root, _, files in os.walk(directory):
+        paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(AUDIO_EXTENSIONS))
+    return sorted(paths)
+
+
+def load_done(out_path):
+    """Files that already have a successful result in the output file."""
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interruption
+            if "error" not in record:
+                done.add(record["file"])
+    return done
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="directory of recorded answers")
+    parser.add_argument("--out", default="batch_results.jsonl", help="JSONL output (appended, used for resuming)")
+    parser.add_argument("--threads", type=int, default=1, help="CPU threads per worker")
+    parser.add_argument("--workers", type=int, help="worker processes (default: cores / threads)")
+    parser.add_argument("--model", default="tiny.en", help="Whisper model size")
+    parser.add_argument("--profile", default="balanced", choices=list(PROFILES),
+                        help="decoding profile (see decoding.py)")
+    parser.add_argument("--interview", action="store_true", help="also get the interviewer's reply to each answer")
+    parser.add_argument("--llm", choices=["fake", "gemini"], default="fake", help="LLM for --interview")
+    args = parser.parse_args()
+
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+    # Keep every native thread pool inside the per-worker budget
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(args.threads)
+    if args.interview and args.llm == "fake":
+        os.environ["COACH_FAKE_LLM"] = "1"
+        os.environ.setdefault("COACH_FAKE_LLM_FIRST_TOKEN", "0")
+        os.environ.setdefault("COACH_FAKE_LLM_TOKEN", "0")
+
+    files = find_audio(args.directory)
+    done = load_done(args.out)
+    todo = [f for f in files if f not in done]
+    print(f"📂 {len(files)} files, {len(files) - len(todo)} already done, {len(todo)} to go "
+          f"({workers} workers x {args.threads} threads)")
+    if not todo:
+        return
+
+    start = time.perf_counter()
+    audio_seconds = 0.0
+    failed = 0
+    with open(args.out, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker,
+        initargs=(args.model, args.threads, args.profile, args.interview),
+    ) as pool:
+        if out.tell() and not _ends_with_newline(args.out):
+            out.write("\n")   # don't glue the first new record onto a line cut short
+        futures = [pool.submit(process_file, path) for path in todo]
+        try:
+            for i, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                if "error" in result:
+                    failed += 1
+                    print(f"⚠️ {result['file']}: {result['error']}")
+                audio_seconds += result.get("audio_seconds", 0.0)
+                if i % 10 == 0 or i == len(todo):
+                    elapsed = time.perf_counter() - start
+                    print(f"[{i}/{len(todo)}] {audio_seconds / elapsed:.1f}s of audio per second")
+        except KeyboardInterrupt:
+            print("\n⏹️ Interrupted - finished results are saved; re-run to resume.")
+            pool.shutdown(wait=False, cancel_futures=True)
+            sys.exit(130)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(todo) - failed} transcribed, {failed} failed in {elapsed:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
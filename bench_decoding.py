@@ -0,0 +1,92 @@
+# bench_decoding.py
+"""Real-time factor and word error rate of each decoding profile.
+
+Decodes every fixture in fixtures/ with each profile from decoding.py and
+compares the transcript with the reference text in fixtures/answers.jsonl.
+Fixtures made with `bench_pipeline.py --make-fixtures` are synthetic speech,
+so the WER is a relative comparison between profiles, not an estimate
+for real candidates (see fixtures/README.md).
+
+    python bench_decoding.py
+    python bench_decoding.py --profiles fast balanced --model base.en --out decoding.json
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from faster_whisper import WhisperModel
+
+from bench_pipeline import fixture_path, load_manifest, load_wav
+from decoding import PROFILES, DecodingPolicy
+
+SAMPLE_RATE = 16000
+
+
+def normalize(text):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance between two texts."""
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1], len(ref)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--model", default="tiny.en", help="Whisper model size")
+    parser.add_argument("--threads", type=int, default=4, help="Whisper CPU threads")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the fixtures per profile")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args()
+
+    fixtures = [(e, load_wav(fixture_path(e), SAMPLE_RATE)) for e in load_manifest() if os.path.exists(fixture_path(e))]
+    if not fixtures:
+        sys.exit("No fixture WAVs in fixtures/ - run 'python bench_pipeline.py --make-fixtures' first")
+
+    model = WhisperModel(args.model, device="cpu", compute_type="int8", cpu_threads=args.threads)
+    audio_seconds = sum(len(audio) for _, audio in fixtures) / SAMPLE_RATE
+
+    # Warm-up so the first profile doesn't pay for lazy initialization
+    DecodingPolicy("fast").transcribe(model, fixtures[0][1])
+
+    results = {}
+    for profile in args.profiles:
+        policy = DecodingPolicy(profile, sample_rate=SAMPLE_RATE)
+        elapsed = 0.0
+        errors = words = 0
+        for _ in range(args.repeat):
+            for entry, audio in fixtures:
+                start = time.perf_counter()
+                segments, _ = policy.transcribe(model, audio)
+                elapsed += time.perf_counter() - start
+                e, n = word_errors(entry["text"], " ".join(s.text for s in segments))
+                errors += e
+                words += n
+        results[profile] = {
+            "rtf": elapsed / (audio_seconds * args.repeat),
+            "wer": errors / max(words, 1),
+            "redecoded_segments": policy.redecoded / max(policy.segments, 1),
+        }
+
+    print(f"{len(fixtures)} fixtures, {audio_seconds:.1f}s of audio, model {args.model}\n")
+    print(f"{'profile':<10}{'RTF':>8}{'WER':>8}{'re-decoded':>12}")
+    for profile, r in results.items():
+        print(f"{profile:<10}{r['rtf']:>8.3f}{r['wer'] * 100:>7.1f}%{r['redecoded_segments'] * 100:>11.0f}%")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"model": args.model, "audio_seconds": audio_seconds, "profiles": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
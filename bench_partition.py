@@ -0,0 +1,65 @@
+# bench_partition.py
+"""Per-stage latency with all stages sharing every core vs. partitioned.
+
+Runs bench_pipeline.py twice with the same turns and background load:
+once the way `python main.py` starts the stages (every library sizes its
+thread pool to all cores), and once with the core sets and thread budgets
+from a supervisor config. Then prints p50/p95 per stage side by side.
+
+    python bench_partition.py
+    python bench_partition.py --config partition.json --load-sessions 3 --turns 8 --tts real
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import supervisor
+
+
+def run_bench(extra, out):
+    cmd = [sys.executable, "bench_pipeline.py", "--out", out] + extra
+    print(f"\n▶️ {' '.join(cmd[1:])}")
+    subprocess.run(cmd, check=True)
+    with open(out, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="partition.json", help="supervisor config with the partition")
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--load-sessions", type=int, default=2, help="other candidates streaming at the same time")
+    parser.add_argument("--tts", choices=["stub", "real"], default="real")
+    parser.add_argument("--out", help="write both reports as JSON")
+    args = parser.parse_args()
+
+    budgets = supervisor.plan(supervisor.load_config(args.config), ["app.py", "tts.py", "file_chat.py"])
+    print(f"🖥️ {len(supervisor.available_cpus())} cores")
+    for prog, budget in budgets.items():
+        print(f"📌 {prog}: {supervisor.describe(budget)}")
+
+    common = ["--turns", str(args.turns), "--load-sessions", str(args.load_sessions), "--tts", args.tts]
+    with tempfile.TemporaryDirectory() as tmp:
+        shared = run_bench(common, os.path.join(tmp, "shared.json"))
+        partitioned = run_bench(common + ["--partition", args.config], os.path.join(tmp, "partitioned.json"))
+
+    print(f"\n{'stage':<22}{'shared p50':>12}{'p95':>8}{'pinned p50':>12}{'p95':>8}{'p95 change':>12}")
+    for stage, a in shared["stages"].items():
+        b = partitioned["stages"].get(stage)
+        if not b:
+            continue
+        change = (b["p95"] - a["p95"]) / a["p95"] * 100 if a["p95"] else 0.0
+        print(f"{stage:<22}{a['p50'] * 1000:>12.0f}{a['p95'] * 1000:>8.0f}"
+              f"{b['p50'] * 1000:>12.0f}{b['p95'] * 1000:>8.0f}{change:>+11.0f}%")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"shared": shared, "partitioned": partitioned}, f, indent=2)
+        print(f"\n💾 Written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
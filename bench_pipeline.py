@@ -0,0 +1,311 @@
+# bench_pipeline.py
+"""End-to-end turn latency benchmark.
+
+Replays WAV fixtures through app.py's callback / stop_recording, runs the
+real file_chat.py and tts.py processes over the message bus with a fake
+Gemini client and the speakers muted, and reports how long each stage
+takes, from "candidate stops speaking" to "interviewer audio starts".
+
+    python bench_pipeline.py --turns 12 --out bench_baseline.json
+    python bench_pipeline.py --compare bench_baseline.json   # exit 1 on regression
+    python bench_pipeline.py --tts real                      # run the Coqui model too
+    python bench_pipeline.py --tts real --load-sessions 2 --partition partition.json
+"""
+import argparse
+import json
+import os
+import secrets
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+FIXTURE_DIR = "fixtures"
+MANIFEST = os.path.join(FIXTURE_DIR, "answers.jsonl")
+
+# (stage, start event, end event); each event is taken at its first occurrence in the turn
+STAGES = [
+    ("transcribe", "stop", "transcribed"),
+    ("llm_first_sentence", "transcribed", "reply_sentence"),
+    ("llm_full_reply", "transcribed", "reply_done"),
+    ("synthesize_first", "reply_sentence", "synthesized"),
+    ("play_start", "synthesized", "play_start"),
+    ("turn_latency", "stop", "play_start"),
+]
+
+
+# ----------------- Fixtures -----------------
+def load_manifest(path=MANIFEST):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_wav(path, sample_rate=16000):
+    """Read a PCM WAV as mono float32 at `sample_rate`."""
+    with wave.open(path, "rb") as w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        raw = w.readframes(w.getnframes())
+    dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+    audio = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+    if width == 1:
+        audio = audio - 128.0
+    audio /= float(2 ** (8 * width - 1))
+    audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != sample_rate:
+        positions = np.arange(int(len(audio) * sample_rate / rate)) * (rate / sample_rate)
+        audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+    return audio
+
+
+def write_wav(path, audio, sample_rate=16000):
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm.tobytes())
+
+
+def fixture_path(entry, fixture_dir=FIXTURE_DIR):
+    return os.path.join(fixture_dir, f"{entry['id']}.wav")
+
+
+def make_fixtures(manifest=MANIFEST, fixture_dir=FIXTURE_DIR, sample_rate=16000):
+    """Synthesize any missing fixture WAVs with the Coqui voice."""
+    from TTS.api import TTS
+
+    voice = TTS(model_name="tts_models/en/ljspeech/vits", gpu=False)
+    rate = voice.synthesizer.output_sample_rate
+    for entry in load_manifest(manifest):
+        path = fixture_path(entry, fixture_dir)
+        if os.path.exists(path):
+            continue
+        audio = np.asarray(voice.tts(text=entry["text"]), dtype=np.float32)
+        positions = np.arange(int(len(audio) * sample_rate / rate)) * (rate / sample_rate)
+        write_wav(path, np.interp(positions, np.arange(len(audio)), audio), sample_rate)
+        print(f"🎙️ Wrote {path}")
+
+
+# ----------------- Stats -----------------
+def summarize(samples):
+    values = np.asarray(samples, dtype=np.float64)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "mean": round(float(values.mean()), 4),
+        "n": int(len(values)),
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Stages whose p95 got slower than the baseline by more than `tolerance`."""
+    regressions = []
+    for stage, stats in report["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if old and stats["p95"] > old["p95"] * (1 + tolerance):
+            regressions.append((stage, old["p95"], stats["p95"]))
+    return regressions
+
+
+# ----------------- Harness -----------------
+def stage_durations(events):
+    """Per-stage seconds for one turn, from {event name: first timestamp}."""
+    return {
+        stage: events[end] - events[start]
+        for stage, start, end in STAGES
+        if start in events and end in events
+    }
+
+
+def run_turn(app, events_rx, audio, speed, timeout):
+    """Replay one answer, stop the recording and wait until the reply has played."""
+    request = SimpleNamespace(session_hash="bench")
+    recorder = app.start_recording(request)
+    next(recorder)
+    partials = threading.Thread(target=lambda: [None for _ in recorder], daemon=True)
+    partials.start()
+
+    # Feed the recording in microphone-sized blocks
+    for start in range(0, len(audio), app.CHUNK_SIZE):
+        block = audio[start:start + app.CHUNK_SIZE]
+        app.callback(block[:, None], len(block), None, None)
+        if speed:
+            time.sleep(len(block) / app.SAMPLE_RATE / speed)
+
+    app.stop_recording(request)
+    partials.join()
+
+    turn = None
+    seen = {}
+    expected = None
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        msg = events_rx.get(timeout=0.5)
+        if msg is None:
+            continue
+        if turn is None and msg.text == "stop":
+            turn = msg.meta["turn"]
+        if msg.meta.get("turn") != turn:
+            continue
+        seen.setdefault(msg.text, msg.meta["t"])
+        if msg.text == "reply_done":
+            expected = msg.meta["sentences"] - 1
+        if msg.text == "played" and expected is not None and msg.meta["index"] >= expected:
+            return seen
+    print(f"⚠️ Turn {turn} timed out; partial events: {sorted(seen)}")
+    return seen
+
+
+def stream_load(app, audio, name, stop):
+    """Another candidate answering non-stop: keeps Whisper busy with streaming decodes."""
+    session = app.get_session(SimpleNamespace(session_hash=name))
+    session.transcriber.model = app.scheduler
+    while not stop.is_set():
+        session.audio_buffer.clear()
+        session.transcriber.reset()
+        session.vad.reset()
+        session.barged_in = True   # load sessions must not cut off the measured replies
+        last = time.perf_counter()
+        for start in range(0, len(audio), app.CHUNK_SIZE):
+            if stop.is_set():
+                return
+            block = audio[start:start + app.CHUNK_SIZE]
+            session.capture(block)
+            time.sleep(len(block) / app.SAMPLE_RATE)
+            if time.perf_counter() - last >= app.STREAM_INTERVAL:
+                last = time.perf_counter()
+                try:
+                    session.transcriber.update(session.audio_buffer.view(), offset=session.audio_buffer.dropped)
+                except app.SchedulerBusy:
+                    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=12, help="measured turns (fixtures are cycled)")
+    parser.add_argument("--tts", choices=["stub", "real"], default="stub", help="stub or really run the Coqui model")
+    parser.add_argument("--tts-cache", action="store_true", help="allow TTS cache hits")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (1 = real time, 0 = as fast as possible)")
+    parser.add_argument("--llm-first-token", type=float, default=0.3, help="fake Gemini time to first token (s)")
+    parser.add_argument("--llm-token", type=float, default=0.02, help="fake Gemini delay between tokens (s)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for a turn")
+    parser.add_argument("--out", default="bench_baseline.json", help="where to write the JSON report")
+    parser.add_argument("--compare", help="baseline JSON to check against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown vs baseline")
+    parser.add_argument("--load-sessions", type=int, default=0,
+                        help="other candidates streaming audio at the same time (overlapping Whisper load)")
+    parser.add_argument("--partition", help="supervisor config: pin each stage to its cores and thread budget")
+    parser.add_argument("--make-fixtures", action="store_true", help="synthesize missing fixture WAVs and exit")
+    args = parser.parse_args()
+
+    if args.make_fixtures:
+        make_fixtures()
+        return
+
+    entries = [e for e in load_manifest() if os.path.exists(fixture_path(e))]
+    if not entries:
+        sys.exit(f"No fixture WAVs in {FIXTURE_DIR}/ - run with --make-fixtures first")
+
+    # Wire the stages together over a private bus, with offline stand-ins
+    bus_dir = tempfile.mkdtemp(prefix="coach-bench-")
+    os.environ.update({
+        "COACH_BUS_DIR": bus_dir,
+        "COACH_BUS_KEY": secrets.token_hex(16),
+        "COACH_EVENTS": "1",
+        "COACH_FAKE_LLM": "1",
+        "COACH_FAKE_LLM_FIRST_TOKEN": str(args.llm_first_token),
+        "COACH_FAKE_LLM_TOKEN": str(args.llm_token),
+        "COACH_NULL_AUDIO": "1",
+        "COACH_TTS_STUB": "1" if args.tts == "stub" else "0",
+        "COACH_TTS_CACHE": "1" if args.tts_cache else "0",
+        "COACH_SESSION_DIR": os.path.join(bus_dir, "sessions"),   # keep benchmark turns out of the real history
+    })
+
+    import bus
+    import supervisor
+    events_rx = bus.BusReceiver(bus.EVENTS, maxsize=1024)
+    budgets = {}
+    if args.partition:
+        budgets = supervisor.plan(supervisor.load_config(args.partition), ["app.py", "tts.py", "file_chat.py"])
+        for prog, budget in budgets.items():
+            print(f"📌 {prog}: {supervisor.describe(budget)}")
+    stages = [
+        supervisor.launch(prog, os.environ, budgets.get(prog), stdout=subprocess.DEVNULL)
+        for prog in ("file_chat.py", "tts.py")
+    ]
+    # app.py runs in this process, so this process takes its cores and thread budget
+    if budgets.get("app.py"):
+        os.environ.update(supervisor.stage_env(os.environ, "app.py", budgets["app.py"]))
+        if hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, budgets["app.py"]["cpus"])
+    stop_load = threading.Event()
+
+    try:
+        import app  # loads Whisper in this process; the microphone is never opened
+        app.models_ready.wait()
+
+        audio = [load_wav(fixture_path(e), app.SAMPLE_RATE) for e in entries]
+        print("🔥 Warm-up turn (not measured) ...")
+        run_turn(app, events_rx, audio[0], 0, max(args.timeout, 600.0))
+
+        for i in range(args.load_sessions):
+            load_audio = np.concatenate(audio)
+            threading.Thread(target=stream_load, args=(app, load_audio, f"load-{i}", stop_load), daemon=True).start()
+
+        durations = {stage: [] for stage, _, _ in STAGES}
+        for i in range(args.turns):
+            seen = run_turn(app, events_rx, audio[i % len(audio)], args.speed, args.timeout)
+            for stage, seconds in stage_durations(seen).items():
+                durations[stage].append(seconds)
+            latency = seen.get("play_start", float("nan")) - seen.get("stop", float("nan"))
+            print(f"Turn {i + 1}/{args.turns}: {latency * 1000:.0f} ms to first audio")
+
+        report = {
+            "config": {
+                "whisper_model": app.MODEL_SIZE,
+                "decoding_profile": app.DECODING_PROFILE,
+                "streaming": app.STREAMING,
+                "tts": args.tts,
+                "tts_cache": args.tts_cache,
+                "llm_first_token": args.llm_first_token,
+                "llm_token": args.llm_token,
+                "speed": args.speed,
+                "load_sessions": args.load_sessions,
+                "partition": {prog: supervisor.describe(b) for prog, b in budgets.items()} if budgets else None,
+            },
+            "turns": args.turns,
+            "stages": {stage: summarize(v) for stage, v in durations.items() if v},
+        }
+    finally:
+        stop_load.set()
+        for p in stages:
+            p.terminate()
+        events_rx.close()
+        shutil.rmtree(bus_dir, ignore_errors=True)
+
+    print(f"\n{'stage':<22}{'p50 ms':>10}{'p95 ms':>10}")
+    for stage, stats in report["stages"].items():
+        print(f"{stage:<22}{stats['p50'] * 1000:>10.0f}{stats['p95'] * 1000:>10.0f}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for stage, old, new in regressions:
+            print(f"❌ {stage}: p95 {old * 1000:.0f} ms -> {new * 1000:.0f} ms")
+        if regressions:
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Baseline written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# bench_tts.py
+"""Real-time factor and output similarity of each TTS backend.
+
+Synthesizes the question bank with every backend from tts_backend.py and
+compares the audio with the full-precision PyTorch output for the same
+sentence and random seed. VITS samples noise while decoding, so the table
+also shows how similar PyTorch is to itself under a different seed; a
+backend that scores close to that line sounds as close as two runs of
+the original.
+
+    python bench_tts.py
+    python bench_tts.py --backends torch int8 --threads 4 --wer --out tts.json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from text_utils import split_sentences
+from tts_backend import BACKENDS, Synthesizer
+
+MODEL_NAME = "tts_models/en/ljspeech/vits"
+BANK = "question_bank.txt"
+
+
+def load_sentences(path, limit):
+    with open(path, "r", encoding="utf-8") as f:
+        phrases = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return [s for phrase in phrases for s in split_sentences(phrase)][:limit]
+
+
+def spectrum(wav, n_fft=1024, hop=256):
+    """Long-term average log-magnitude spectrum."""
+    if len(wav) < n_fft:
+        wav = np.pad(wav, (0, n_fft - len(wav)))
+    frames = np.lib.stride_tricks.sliding_window_view(wav, n_fft)[::hop] * np.hanning(n_fft)
+    return np.log(np.abs(np.fft.rfft(frames, axis=1)).mean(axis=0) + 1e-6)
+
+
+def similarity(a, b):
+    """Cosine similarity of the two spectra (1.0 = identical) and the length ratio b / a."""
+    sa, sb = spectrum(a), spectrum(b)
+    sa, sb = sa - sa.mean(), sb - sb.mean()
+    cosine = float(sa @ sb / (np.linalg.norm(sa) * np.linalg.norm(sb) + 1e-12))
+    return cosine, len(b) / max(len(a), 1)
+
+
+def run(synth, sentences, seed_offset=0):
+    """Synthesize every sentence with a fixed seed; returns (outputs, seconds spent)."""
+    outputs, elapsed = [], 0.0
+    for i, sentence in enumerate(sentences):
+        synth.torch.manual_seed(seed_offset + i)
+        start = time.perf_counter()
+        outputs.append(synth.synthesize(sentence))
+        elapsed += time.perf_counter() - start
+    return outputs, elapsed
+
+
+def transcript_wer(outputs, sentences, sample_rate):
+    """Word error rate of Whisper listening to the synthesized audio."""
+    from faster_whisper import WhisperModel
+    from bench_decoding import word_errors
+
+    model = WhisperModel("tiny.en", device="cpu", compute_type="int8")
+    errors = words = 0
+    for wav, sentence in zip(outputs, sentences):
+        t = np.arange(0, len(wav) / sample_rate, 1 / 16000)
+        audio = np.interp(t, np.arange(len(wav)) / sample_rate, wav).astype(np.float32)
+        segments, _ = model.transcribe(audio, beam_size=1)
+        e, n = word_errors(sentence, " ".join(s.text for s in segments))
+        errors += e
+        words += n
+    return errors / max(words, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--threads", type=int, default=0, help="intra-op threads (0 = library default)")
+    parser.add_argument("--no-inference-mode", action="store_true", help="synthesize without torch.inference_mode()")
+    parser.add_argument("--sentences", type=int, default=20, help="sentences from the question bank")
+    parser.add_argument("--wer", action="store_true", help="also score intelligibility with Whisper")
+    parser.add_argument("--out", help="write the results as JSON")
+    args = parser.parse_args()
+
+    sentences = load_sentences(BANK, args.sentences)
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    results = {}
+    reference = None
+    for backend in backends:
+        synth = Synthesizer(MODEL_NAME, backend=backend, threads=args.threads, inference_mode=not args.no_inference_mode)
+        synth.synthesize(sentences[0])   # warm-up
+        outputs, elapsed = run(synth, sentences)
+        audio_seconds = sum(len(w) for w in outputs) / synth.sample_rate
+        result = {"ran_as": synth.backend, "fallback_reason": synth.fallback_reason, "rtf": elapsed / audio_seconds}
+        if reference is None:
+            reference = outputs
+            reseeded, _ = run(synth, sentences, seed_offset=10_000)
+            pairs = [similarity(a, b) for a, b in zip(reference, reseeded)]
+            results["torch (reseeded)"] = {
+                "similarity": float(np.mean([c for c, _ in pairs])),
+                "length_ratio": float(np.mean([r for _, r in pairs])),
+            }
+        pairs = [similarity(a, b) for a, b in zip(reference, outputs)]
+        result["similarity"] = float(np.mean([c for c, _ in pairs]))
+        result["length_ratio"] = float(np.mean([r for _, r in pairs]))
+        if args.wer:
+            result["wer"] = transcript_wer(outputs, sentences, synth.sample_rate)
+        results[backend] = result
+        print(f"{backend}: {synth.describe()}")
+        del synth
+
+    print(f"\n{len(sentences)} sentences\n")
+    print(f"{'backend':<18}{'RTF':>8}{'similarity':>12}{'length':>8}" + (f"{'WER':>8}" if args.wer else ""))
+    for name, r in results.items():
+        rtf = f"{r['rtf']:>8.3f}" if "rtf" in r else f"{'':>8}"
+        line = f"{name:<18}{rtf}{r['similarity']:>12.3f}{r['length_ratio']:>8.2f}"
+        if args.wer and "wer" in r:
+            line += f"{r['wer'] * 100:>7.1f}%"
+        print(line + (f"  (fell back: {r['fallback_reason']})" if r.get("fallback_reason") else ""))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"model": MODEL_NAME, "sentences": len(sentences), "backends": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+# bus.py
+import os
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from multiprocessing.connection import Client, Listener
+
+# Channels (one receiving process per channel)
+TRANSCRIPT = "transcript"   # app.py -> file_chat.py
+REPLY = "reply"             # file_chat.py -> tts.py
+CONTROL = "control"         # app.py -> tts.py (barge-in)
+EVENTS = "events"           # stage timings -> bench_pipeline.py (only when COACH_EVENTS is set)
+
+
+@dataclass
+class TurnMessage:
+    """A single hand-off between pipeline stages."""
+    kind: str
+    text: str
+    seq: int = 0
+    sender: str = ""
+    meta: dict = field(default_factory=dict)
+
+
+def bus_dir():
+    """Directory holding the channel sockets, set up by main.py."""
+    return os.environ.get("COACH_BUS_DIR")
+
+
+def bus_enabled():
+    return bool(bus_dir())
+
+
+def _address(channel):
+    return os.path.join(bus_dir(), f"{channel}.sock")
+
+
+def _authkey():
+    return os.environ.get("COACH_BUS_KEY", "coach").encode()
+
+
+# ----------------- Unix socket transport -----------------
+class BusReceiver:
+    """Listens on a channel socket and queues incoming messages in order.
+
+    Senders get an ack only after their message is queued, so a full queue
+    blocks them (backpressure). Messages are deduplicated per sender by
+    sequence number, so a resend after a dropped connection is never
+    processed twice.
+    """
+
+    def __init__(self, channel, maxsize=8):
+        self.channel = channel
+        self.queue = queue.Queue(maxsize)
+        self._last_seq = {}
+        self._lock = threading.Lock()
+        path = _address(channel)
+        if os.path.exists(path):
+            os.remove(path)
+        self._listener = Listener(path, family="AF_UNIX", authkey=_authkey())
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            while True:
+                msg = conn.recv()
+                with self._lock:
+                    duplicate = msg.seq <= self._last_seq.get(msg.sender, 0)
+                    if not duplicate:
+                        self._last_seq[msg.sender] = msg.seq
+                if not duplicate:
+                    self.queue.put(msg)
+                conn.send(msg.seq)
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+    def get(self, timeout=None):
+        """Return the next message, or None if nothing arrives within `timeout`."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._listener.close()
+
+
+class BusSender:
+    """Sends sequenced messages to a channel, reconnecting if needed."""
+
+    def __init__(self, channel, connect_timeout=30.0):
+        self.channel = channel
+        self.connect_timeout = connect_timeout
+        self.sender = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.seq = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is not None:
+            return self._conn
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                self._conn = Client(_address(self.channel), family="AF_UNIX", authkey=_authkey())
+                return self._conn
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def send(self, kind, text, **meta):
+        """Deliver a message and wait until the receiver has queued it."""
+        with self._lock:
+            self.seq += 1
+            msg = TurnMessage(kind=kind, text=text, seq=self.seq, sender=self.sender, meta=meta)
+            for attempt in range(2):
+                try:
+                    conn = self._connect()
+                    conn.send(msg)
+                    conn.recv()
+                    return msg
+                except (EOFError, OSError):
+                    # Receiver restarted; resend the same seq on a fresh connection
+                    if self._conn is not None:
+                        self._conn.close()
+                    self._conn = None
+                    if attempt:
+                        raise
+
+
+# ----------------- File fallback -----------------
+class FileSender:
+    """Writes each message over a text file (the original hand-off)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.seq = 0
+
+    def send(self, kind, text, **meta):
+        self.seq += 1
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        return TurnMessage(kind=kind, text=text, seq=self.seq, meta=meta)
+
+
+class FileReceiver:
+    """Polls a text file's mtime and reports each change as a message."""
+
+    def __init__(self, path, kind, poll_interval=0.5):
+        self.path = path
+        self.kind = kind
+        self.poll_interval = poll_interval
+        self.seq = 0
+        self._last_mtime = os.path.getmtime(path) if os.path.exists(path) else None
+
+    def get(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if os.path.exists(self.path):
+                mtime = os.path.getmtime(self.path)
+                if mtime != self._last_mtime:
+                    self._last_mtime = mtime
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        text = f.read().strip()
+                    self.seq += 1
+                    return TurnMessage(kind=self.kind, text=text, seq=self.seq)
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    def close(self):
+        pass
+
+
+# ----------------- Stage timing events -----------------
+_event_sender = None
+_event_lock = threading.Lock()
+
+
+def emit_event(name, turn, **fields):
+    """Report a timestamped stage event to the benchmark harness, if one is listening."""
+    global _event_sender
+    if not os.environ.get("COACH_EVENTS") or not bus_enabled():
+        return
+    with _event_lock:
+        if _event_sender is None:
+            _event_sender = BusSender(EVENTS, connect_timeout=1.0)
+    try:
+        _event_sender.send(EVENTS, name, turn=turn, t=time.time(), **fields)
+    except (OSError, EOFError):
+        pass
+
+
+# ----------------- Factories -----------------
+def open_sender(channel, fallback_path, connect_timeout=30.0):
+    """Socket sender when main.py set up the bus, file writer otherwise."""
+    if bus_enabled():
+        return BusSender(channel, connect_timeout=connect_timeout)
+    return FileSender(fallback_path)
+
+
+def open_receiver(channel, fallback_path, poll_interval=0.5):
+    """Socket receiver when main.py set up the bus, file poller otherwise."""
+    if bus_enabled():
+        return BusReceiver(channel)
+    return FileReceiver(fallback_path, channel, poll_interval)
@@ -0,0 +1,111 @@
+# context.py
+
+SUMMARY_PROMPT = (
+    "Summarize this job interview so far in at most {words} words. Keep the role, "
+    "the questions already asked, and the key facts and weaknesses in the candidate's "
+    "answers. Plain prose, no lists.\n\n{transcript}"
+)
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token) for budgeting."""
+    return max(1, len(text) // 4)
+
+
+def _message(role, text):
+    return {"role": role, "parts": [{"text": text}]}
+
+
+class ManagedChat:
+    """Drop-in for a genai chat session that keeps the prompt within a token budget.
+
+    The system instruction and the last `keep_recent` exchanges are always
+    sent verbatim. Once the history grows past `token_budget`, older
+    exchanges are folded into a rolling summary (policy "summary") or
+    dropped (policy "window"). Sending never compacts: the caller runs
+    compact() once the reply has gone downstream, since summarizing is an
+    LLM call of its own.
+    """
+
+    def __init__(self, client, model, config, token_budget=2000, keep_recent=4, policy="summary", summary_words=150):
+        if policy not in ("summary", "window"):
+            raise ValueError(f"Unknown context policy: {policy}")
+        self.client = client
+        self.model = model
+        self.config = config
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.policy = policy
+        self.summary_words = summary_words
+        self.summary = ""
+        self.turns = []           # (user message, reply) pairs kept verbatim
+        self.prompt_tokens = []   # prompt size of every turn sent so far
+
+    def _contents(self, message):
+        contents = []
+        if self.summary:
+            contents.append(_message("user", f"Summary of the interview so far: {self.summary}"))
+            contents.append(_message("model", "Understood."))
+        for user, reply in self.turns:
+            contents.append(_message("user", user))
+            contents.append(_message("model", reply))
+        contents.append(_message("user", message))
+        return contents
+
+    def history_tokens(self):
+        return estimate_tokens(self.summary) + sum(estimate_tokens(u) + estimate_tokens(r) for u, r in self.turns)
+
+    def send_message(self, message):
+        response = self.client.models.generate_content(
+            model=self.model, contents=self._contents(message), config=self.config
+        )
+        self._record(message, response.text or "", getattr(response, "usage_metadata", None))
+        return response
+
+    def send_message_stream(self, message):
+        contents = self._contents(message)
+        parts = []
+        usage = None
+        for chunk in self.client.models.generate_content_stream(model=self.model, contents=contents, config=self.config):
+            parts.append(chunk.text or "")
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+        self._record(message, "".join(parts), usage, contents)
+
+    def record_partial(self, message, reply):
+        """Keep an exchange whose reply was cut short (or replaced) as the candidate heard it."""
+        self._record(message, reply, None)
+
+    def _record(self, message, reply, usage, contents=None):
+        count = getattr(usage, "prompt_token_count", None)
+        if count is None:
+            count = sum(estimate_tokens(p["parts"][0]["text"]) for p in contents or self._contents(message))
+            count += estimate_tokens(str(self.config.get("system_instruction", "")))
+        self.prompt_tokens.append(count)
+        self.turns.append((message, reply))
+
+    def compact(self):
+        """Fold or drop older exchanges if the history is over budget."""
+        if self.history_tokens() > self.token_budget:
+            self._compact()
+
+    def _compact(self):
+        old = self.turns[:-self.keep_recent] if self.keep_recent else self.turns
+        if not old:
+            return
+        self.turns = self.turns[len(old):]
+        if self.policy == "window":
+            return
+        transcript = "\n".join(f"Candidate: {u}\nInterviewer: {r}" for u, r in old)
+        if self.summary:
+            transcript = f"Earlier summary: {self.summary}\n\n{transcript}"
+        try:
+            response = self.client.models.generate_content(
+                model=self.model,
+                contents=SUMMARY_PROMPT.format(words=self.summary_words, transcript=transcript),
+                config={"temperature": 0.2},
+            )
+            self.summary = (response.text or "").strip() or self.summary
+        except Exception as e:
+            # Keep going with the old summary; the dropped turns are lost
+            print(f"⚠️ Could not summarize older turns: {e}")
@@ -0,0 +1,80 @@
+# decoding.py
+import os
+
+# Named speed/accuracy trade-offs. Each decodes with `beam_size` first and
+# re-decodes low-confidence segments with `fallback_beam_size`.
+PROFILES = {
+    "fast": {"beam_size": 1, "fallback_beam_size": 5, "logprob_threshold": -1.0, "compression_threshold": 2.4},
+    "balanced": {"beam_size": 2, "fallback_beam_size": 8, "logprob_threshold": -0.7, "compression_threshold": 2.2},
+    "accurate": {"beam_size": 5, "fallback_beam_size": 15, "logprob_threshold": -0.5, "compression_threshold": 2.0},
+    "legacy": {"beam_size": 15, "fallback_beam_size": None, "logprob_threshold": None, "compression_threshold": None},
+}
+DEFAULT_PROFILE = os.environ.get("COACH_DECODING_PROFILE", "balanced")
+
+SEGMENT_PAD = 0.2        # seconds of context around a segment when re-decoding
+MIN_REDECODE = 0.3       # segments shorter than this are not worth re-decoding
+
+
+class DecodingPolicy:
+    """Cheap first pass, wide beam only where Whisper is unsure.
+
+    transcribe() has the same shape as WhisperModel.transcribe (returns a
+    list of segments and the info). Segments whose avg_logprob falls below
+    `logprob_threshold`, or whose compression_ratio rises above
+    `compression_threshold` (a sign of repetition), are cut out of the audio
+    and decoded again with `fallback_beam_size`.
+    """
+
+    def __init__(self, profile=DEFAULT_PROFILE, temperature=0.0, sample_rate=16000, **overrides):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown decoding profile: {profile} (choose from {', '.join(PROFILES)})")
+        settings = {**PROFILES[profile], **overrides}
+        self.profile = profile
+        self.temperature = temperature
+        self.sample_rate = sample_rate
+        self.beam_size = settings["beam_size"]
+        self.fallback_beam_size = settings["fallback_beam_size"]
+        self.logprob_threshold = settings["logprob_threshold"]
+        self.compression_threshold = settings["compression_threshold"]
+        self.segments = 0
+        self.redecoded = 0
+
+    def needs_redecode(self, segment):
+        if not self.fallback_beam_size or segment.end - segment.start < MIN_REDECODE:
+            return False
+        if self.logprob_threshold is not None and segment.avg_logprob < self.logprob_threshold:
+            return True
+        return self.compression_threshold is not None and segment.compression_ratio > self.compression_threshold
+
+    def transcribe(self, model, audio, **options):
+        options.setdefault("beam_size", self.beam_size)
+        options.setdefault("temperature", self.temperature)
+        segments, info = model.transcribe(audio, **options)
+        segments = list(segments)
+        self.segments += len(segments)
+
+        result = []
+        for segment in segments:
+            if not self.needs_redecode(segment):
+                result.append(segment)
+                continue
+            start = max(int((segment.start - SEGMENT_PAD) * self.sample_rate), 0)
+            end = min(int((segment.end + SEGMENT_PAD) * self.sample_rate), len(audio))
+            retry, _ = model.transcribe(
+                audio[start:end], beam_size=self.fallback_beam_size, temperature=self.temperature,
+                initial_prompt=options.get("initial_prompt"), without_timestamps=True
+            )
+            retry = list(retry)
+            logprob = sum(s.avg_logprob for s in retry) / len(retry) if retry else float("-inf")
+            # Keep the first pass unless the wide beam is more confident (or the first pass looped)
+            repeated = self.compression_threshold is not None and segment.compression_ratio > self.compression_threshold
+            if not retry or (logprob < segment.avg_logprob and not repeated):
+                result.append(segment)
+                continue
+            self.redecoded += 1
+            result.append(segment._replace(
+                text=" " + " ".join(s.text.strip() for s in retry),
+                avg_logprob=logprob,
+                compression_ratio=max(s.compression_ratio for s in retry),
+            ))
+        return result, info
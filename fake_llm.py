@@ -0,0 +1,120 @@
+# fake_llm.py
+import itertools
+import os
+import re
+import time
+from types import SimpleNamespace
+
+# Canned interviewer replies, cycled in order
+REPLIES = [
+    "That's a good start. Can you walk me through a specific project where you applied that skill? "
+    "What was your role, and what was the outcome?",
+    "Thank you. What would you do differently if you faced the same situation again?",
+    "I see. How do you prioritize when several deadlines compete for your attention? Give me a concrete example.",
+    "Understood. Tell me about a time you disagreed with a teammate. How did you resolve it?",
+]
+
+
+def _tokens(text):
+    """Split text into word-sized chunks that keep their trailing whitespace."""
+    return re.findall(r"\S+\s*", text)
+
+
+class FakeChat:
+    """Stand-in for a google-genai chat session that needs no network.
+
+    `first_token_delay` models time-to-first-token and `token_delay` the
+    gap between streamed tokens, so the streaming and blocking paths can be
+    compared offline.
+    """
+
+    def __init__(self, first_token_delay=0.3, token_delay=0.02, replies=None):
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self._replies = itertools.cycle(replies or REPLIES)
+        self.history = []
+
+    def send_message_stream(self, message):
+        self.history.append(message)
+        reply = next(self._replies)
+        time.sleep(self.first_token_delay)
+        for i, token in enumerate(_tokens(reply)):
+            if i:
+                time.sleep(self.token_delay)
+            yield SimpleNamespace(text=token)
+        self.history.append(reply)
+
+    def send_message(self, message):
+        text = "".join(chunk.text for chunk in self.send_message_stream(message))
+        return SimpleNamespace(text=text)
+
+
+class FakeModels:
+    """Stand-in for `client.models`, used by context.ManagedChat."""
+
+    def __init__(self, first_token_delay, token_delay, replies=None):
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self._replies = itertools.cycle(replies or REPLIES)
+
+    def generate_content_stream(self, model=None, contents=None, config=None):
+        text = contents if isinstance(contents, str) else " ".join(
+            part["text"] for content in contents for part in content["parts"]
+        )
+        usage = SimpleNamespace(prompt_token_count=max(1, len(text) // 4))
+        reply = next(self._replies)
+        time.sleep(self.first_token_delay)
+        tokens = _tokens(reply)
+        for i, token in enumerate(tokens):
+            if i:
+                time.sleep(self.token_delay)
+            last = i == len(tokens) - 1
+            yield SimpleNamespace(text=token, usage_metadata=usage if last else None)
+
+    def generate_content(self, model=None, contents=None, config=None):
+        chunks = list(self.generate_content_stream(model, contents, config))
+        return SimpleNamespace(text="".join(c.text for c in chunks), usage_metadata=chunks[-1].usage_metadata)
+
+
+class FakeClient:
+    """Mirrors the `genai.Client()` entry points (`chats.create` and `models`)."""
+
+    def __init__(self, first_token_delay=None, token_delay=None, replies=None):
+        if first_token_delay is None:
+            first_token_delay = float(os.environ.get("COACH_FAKE_LLM_FIRST_TOKEN", "0.3"))
+        if token_delay is None:
+            token_delay = float(os.environ.get("COACH_FAKE_LLM_TOKEN", "0.02"))
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.replies = replies
+        self.chats = SimpleNamespace(create=self._create_chat)
+        self.models = FakeModels(first_token_delay, token_delay, replies)
+
+    def _create_chat(self, model=None, config=None, history=None):
+        return FakeChat(self.first_token_delay, self.token_delay, self.replies)
+
+
+def fake_llm_enabled():
+    return os.environ.get("COACH_FAKE_LLM", "") not in ("", "0")
+
+
+if __name__ == "__main__":
+    # Compare time-to-first-sentence for the blocking and streaming paths
+    from text_utils import SentenceStream, clean_text
+
+    client = FakeClient()
+
+    start = time.perf_counter()
+    reply = clean_text(client.chats.create().send_message("Tell me about yourself.").text)
+    blocking = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stream = SentenceStream()
+    first = None
+    for chunk in client.chats.create().send_message_stream("Tell me about yourself."):
+        if stream.feed(chunk.text) and first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+
+    print(f"Blocking:  first sentence after {blocking * 1000:.0f} ms")
+    print(f"Streaming: first sentence after {first * 1000:.0f} ms (full reply {total * 1000:.0f} ms)")
@@ -1,19 +1,61 @@
 # file_chat.py
 import time
 import os
-import re
-from google import genai
-
-# Get the API key from the environment variable
-api_key = os.environ.get('GOOGLE_API_KEY')
-if not api_key:
-    raise ValueError("GOOGLE_API_KEY environment variable not set! Please check your run_coach.sh script.")
+import bus
+import tracing
+import readiness
+from fake_llm import FakeClient, fake_llm_enabled
+from text_utils import SentenceStream, clean_text
+from context import ManagedChat
+from session_store import SessionStore, sessions_enabled
+from llm_client import ResilientClient, fallback_question, make_genai_client
 
 input_file = "input.txt"
 output_file = "chat_output.txt"
 
-# ✅ CORRECT: Initialize client (SDK will use GOOGLE_API_KEY automatically)
-client = genai.Client(api_key=api_key)
+# Forward each sentence downstream as soon as Gemini finishes it
+STREAM_REPLIES = True
+
+# Send one tiny request at startup so the first turn reuses an open connection
+WARMUP_LLM = True
+
+# Conversation context: history beyond the budget is summarized ("summary") or dropped ("window")
+CONTEXT_TOKEN_BUDGET = 2000
+CONTEXT_KEEP_RECENT = 4      # exchanges always sent verbatim
+CONTEXT_POLICY = "summary"
+
+# Gemini calls: overall deadline, retries and hedging (see llm_client.py)
+RESILIENT_LLM = True
+LLM_DEADLINE = 15.0          # seconds per reply, retries included
+LLM_ATTEMPT_TIMEOUT = 6.0    # seconds to the first chunk per attempt
+LLM_RETRIES = 2
+LLM_HEDGE = True             # send a second request when the first is slower than p95
+LLM_BASE_URL = os.environ.get("COACH_LLM_BASE_URL")   # e.g. mock_llm_server.py
+
+# Seconds to reach tts.py before a reply goes unspoken (it may be restarting)
+SEND_TIMEOUT = 2.0
+
+
+def make_client():
+    """Gemini client, or the offline stand-in when COACH_FAKE_LLM is set."""
+    if fake_llm_enabled():
+        print("🧪 Using fake LLM (COACH_FAKE_LLM)")
+        return FakeClient()
+
+    # Get the API key from the environment variable (any key will do for the mock server)
+    api_key = os.environ.get('GOOGLE_API_KEY') or ("mock" if LLM_BASE_URL else None)
+    if not api_key:
+        raise ValueError("GOOGLE_API_KEY environment variable not set! Please check your run_coach.sh script.")
+
+    # ✅ One client, so every request reuses the same connection pool
+    return make_genai_client(api_key, base_url=LLM_BASE_URL)
+
+
+client = make_client()
+if RESILIENT_LLM:
+    client = ResilientClient(
+        client, deadline=LLM_DEADLINE, attempt_timeout=LLM_ATTEMPT_TIMEOUT, retries=LLM_RETRIES, hedge=LLM_HEDGE
+    )
 
 # 🔑 System instruction for the interviewer
 system_instruction = (
@@ -23,70 +65,144 @@ system_instruction = (
     "Every response you give must be a QUESTION or a feedback of answer or a proper response."
 )
 
-def clean_text(text):
-    """Clean text for TTS compatibility"""
-    text = text.replace("AI/ML", "AI and ML")
-    text = re.sub(r"[\[\]\(\)\{\}<>]", "", text)  # remove brackets/parentheses
-    text = text.replace("/", " and ")  # general slash replacement
-    text = text.replace('"', "")       # remove quotes
-    text = text.replace("—", "-")      # normalize dashes
-    text = text.replace("\n", " ")     # merge multiple lines
-    text = re.sub(r"\s+", " ", text).strip()  # collapse multiple spaces
-    return text
-
-# ✅ CORRECT: Create chat session using client.chats.create()
-# This is the proper way according to the official SDK documentation
-chat = client.chats.create(
+# Chat session with a bounded context (same send_message / send_message_stream interface)
+chat = ManagedChat(
+    client,
     model='gemini-2.0-flash-exp',
     config={
         'system_instruction': system_instruction,
         'temperature': 0.7,
-    }
+    },
+    token_budget=CONTEXT_TOKEN_BUDGET,
+    keep_recent=CONTEXT_KEEP_RECENT,
+    policy=CONTEXT_POLICY,
 )
 
-last_mtime = None  # To track file changes
-
-def read_input():
-    """Reads the full input file content."""
-    if not os.path.exists(input_file):
-        return None
-    with open(input_file, "r") as f:
-        return f.read().strip()
-
-def write_response(text):
-    """Writes the AI's response to the output file."""
-    with open(output_file, "w") as f:
-        f.write(text + "\n")
-
-# Main loop
-print("🔄 Watching input.txt ...")
-while True:
-    try:
-        if os.path.exists(input_file):
-            mtime = os.path.getmtime(input_file)  # last modified time
-            if last_mtime is None:
-                last_mtime = mtime
-
-            if mtime != last_mtime:  # if file has changed
-                user_message = read_input()
-                last_mtime = mtime
-
-                if user_message:
-                    try:
-                        # ✅ CORRECT: Use chat.send_message()
+def stream_reply(chat, user_message, on_sentence, trace_id=None):
+    """Stream a reply, calling `on_sentence(sentence, index)` for each cleaned sentence as it closes.
+
+    Returns the list of sentences.
+    """
+    stream = SentenceStream()
+    sentences = []
+    start = time.perf_counter()
+    cleaning = 0.0
+
+    def emit(completed):
+        for sentence in completed:
+            if not sentences:
+                tracing.record("llm_first_sentence", time.perf_counter() - start, trace_id)
+            on_sentence(sentence, len(sentences))
+            sentences.append(sentence)
+
+    for chunk in chat.send_message_stream(user_message):
+        t = time.perf_counter()
+        completed = stream.feed(chunk.text or "")
+        cleaning += time.perf_counter() - t
+        emit(completed)
+    emit(stream.flush())
+    tracing.record("clean", cleaning, trace_id)
+    return sentences
+
+
+def warm_start():
+    start = time.perf_counter()
+    if WARMUP_LLM:
+        try:
+            chat.client.models.generate_content(
+                model=chat.model, contents="Reply with OK.", config={"max_output_tokens": 5}
+            )
+        except Exception as e:
+            print(f"⚠️ LLM warm-up failed: {e}")
+    readiness.mark_ready("chat", warmup=time.perf_counter() - start)
+
+
+def main():
+    receiver = bus.open_receiver(bus.TRANSCRIPT, input_file, poll_interval=1.0)
+    sender = bus.open_sender(bus.REPLY, output_file, connect_timeout=SEND_TIMEOUT)
+    store = SessionStore() if sessions_enabled() else None   # app.py saved the answer; we add the reply
+    warm_start()
+
+    print("🔄 Waiting for transcripts ...")
+    while True:
+        try:
+            msg = receiver.get(timeout=1.0)
+            if msg is None or not msg.text:
+                continue
+
+            user_message = msg.text
+            turn = msg.meta.get("turn")
+            start = time.perf_counter()
+            sent = []
+            delivered = True
+
+            def forward(sentence, index):
+                nonlocal delivered
+                sent.append(sentence)
+                if not delivered:
+                    return
+                bus.emit_event("reply_sentence", turn, index=index)
+                try:
+                    sender.send(bus.REPLY, sentence, turn=turn, index=index)
+                except (OSError, EOFError) as e:
+                    # tts.py is down (e.g. restarting): not a Gemini failure, so let the reply finish
+                    delivered = False
+                    tracing.record("reply_undelivered", 1, turn)
+                    print(f"⚠️ Could not reach tts.py: {e}")
+
+            fallback = False
+            try:
+                # File hand-off can't carry several writes per turn, so stream only over the bus
+                if STREAM_REPLIES and bus.bus_enabled():
+                    with tracing.span("llm", turn):
+                        stream_reply(chat, user_message, forward, turn)
+                else:
+                    with tracing.span("llm", turn):
                         response = chat.send_message(user_message)
-                        reply = response.text
-                        
-                        # 🔹 Clean Gemini output for TTS
-                        reply = clean_text(reply)
-                        
-                        write_response(reply)
-                        print(f"User: {user_message}\nGemini: {reply}\n")
+
+                    # 🔹 Clean Gemini output for TTS
+                    with tracing.span("clean", turn):
+                        reply = clean_text(response.text)
+                    forward(reply, 0)
+            except Exception as e:
+                tracing.record("llm_errors", 1, turn)
+                print(f"⚠️ Error with Gemini API: {e}")
+                if sent:
+                    # Keep what was already spoken, so the next prompt has the question the candidate heard
+                    print("⚠️ Reply cut short")
+                    chat.record_partial(user_message, " ".join(sent))
+                else:
+                    # Don't leave the candidate waiting: ask a stock question instead
+                    fallback = True
+                    question = fallback_question()
+                    chat.record_partial(user_message, question)
+                    tracing.record("llm_fallbacks", 1, turn)
+                    forward(question, 0)
+
+            try:
+                reply = " ".join(sent)
+                bus.emit_event("reply_done", turn, sentences=len(sent))
+                if store is not None:
+                    try:
+                        store.set_reply(turn, reply, llm=time.perf_counter() - start)
                     except Exception as e:
-                        print(f"⚠️ Error with Gemini API: {e}")
+                        print(f"⚠️ Could not save the reply: {e}")
+                print(f"User: {user_message}\nGemini: {reply}")
+                if not fallback and chat.prompt_tokens:
+                    tracing.record("prompt_tokens", chat.prompt_tokens[-1], turn)
+                    print(f"📏 Prompt tokens: {chat.prompt_tokens[-1]} (history {chat.history_tokens()})\n")
+                # Summarizing older turns is another LLM call; the reply is already downstream
+                chat.compact()
+            except Exception as e:
+                # Bookkeeping only; the reply is already on its way
+                print(f"⚠️ Could not finish turn {turn}: {e}")
+
+        except KeyboardInterrupt:
+            print("⏹️ Stopped by user.")
+            receiver.close()
+            break
 
-        time.sleep(1)
 
-    except KeyboardInterrupt:
-        print("⏹️ Stopped by user.")
-        break
+if __name__ == "__main__":
+    tracing.init("chat")
+    main()
@@ -0,0 +1,356 @@
+# llm_client.py
+"""Deadlines, retries, hedging and a circuit breaker around the Gemini client.
+
+ResilientClient wraps a genai.Client (or fake_llm.FakeClient) and offers
+the same `models.generate_content` / `models.generate_content_stream`
+calls, so context.ManagedChat works on top of it unchanged. Requests run
+on one private asyncio loop through `client.aio`, so every request and
+every hedge shares the client's single HTTP connection pool.
+
+To see the tail-latency behavior offline, start the mock server and point
+the client at it:
+
+    python mock_llm_server.py --slow-rate 0.05 --slow-latency 4 --error-rate 0.05 &
+    python llm_client.py --base-url http://127.0.0.1:8765 --requests 200
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import numpy as np
+
+import tracing
+
+# Asked when Gemini can't be reached, so the interview keeps going
+FALLBACK_QUESTIONS = [
+    "Let's move on. Can you tell me about a challenge you faced recently and how you handled it?",
+    "Let's try another one. What is an accomplishment you are particularly proud of, and why?",
+    "Moving on. How do you keep your skills up to date in your field?",
+    "Next question. Describe a time you had to learn something new quickly.",
+]
+_fallbacks = itertools.cycle(FALLBACK_QUESTIONS)
+
+
+def fallback_question():
+    return next(_fallbacks)
+
+
+class LLMUnavailable(Exception):
+    """Raised when a request failed after all retries, or the circuit is open."""
+
+
+class CircuitOpen(LLMUnavailable):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after `failures` failed requests in a row; lets one trial through after `cooldown` seconds."""
+
+    def __init__(self, failures=3, cooldown=30.0):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive = 0
+        self.opened_at = 0.0
+
+    def allow(self):
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = "half-open"
+            return True
+        return self.state != "open"
+
+    def success(self):
+        self.state = "closed"
+        self.consecutive = 0
+
+    def failure(self):
+        self.consecutive += 1
+        if self.state == "half-open" or self.consecutive >= self.failures:
+            if self.state != "open":
+                print(f"⚠️ LLM circuit open for {self.cooldown:.0f}s after {self.consecutive} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+def _retryable(error):
+    """Client errors (4xx other than timeout / rate limit) won't get better by retrying."""
+    code = getattr(error, "code", None)
+    return not (isinstance(code, int) and 400 <= code < 500 and code not in (408, 429))
+
+
+class _ThreadStream:
+    """Async iterator over a blocking chunk iterator (for clients without `aio`)."""
+
+    _END = object()
+
+    def __init__(self, iterator):
+        self._iterator = iter(iterator)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await asyncio.to_thread(next, self._iterator, self._END)
+        if chunk is self._END:
+            raise StopAsyncIteration
+        return chunk
+
+    async def aclose(self):
+        pass
+
+
+async def _close(stream):
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception:
+            pass
+
+
+class ResilientClient:
+    """Gemini calls that always come back within `deadline` seconds.
+
+    - Each attempt gets `attempt_timeout` seconds (streams: until the first
+      chunk), and the whole request, retries included, gets `deadline`.
+    - Failed attempts are retried up to `retries` times after a full-jitter
+      exponential backoff starting at `backoff`.
+    - With `hedge`, once `hedge_min_samples` latencies have been seen, an
+      attempt still running past their p95 gets a second, identical request;
+      whichever answers first wins and the other is cancelled.
+    - After `breaker_failures` failed requests in a row, requests fail fast
+      with CircuitOpen for `breaker_cooldown` seconds.
+    - Failures raise LLMUnavailable; callers serve fallback_question().
+    """
+
+    def __init__(self, client, deadline=15.0, attempt_timeout=8.0, retries=2, backoff=0.25,
+                 hedge=True, hedge_min_samples=20, hedge_floor=0.2, breaker_failures=3, breaker_cooldown=30.0):
+        self.client = client
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_floor = hedge_floor
+        self.breaker = CircuitBreaker(breaker_failures, breaker_cooldown)
+        self.stats = {"requests": 0, "retries": 0, "timeouts": 0, "hedges": 0, "hedge_wins": 0,
+                      "failures": 0, "short_circuits": 0}
+        self._latencies = {"full": deque(maxlen=200), "first_chunk": deque(maxlen=200)}
+        self._async = getattr(client, "aio", None)
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True).start()
+        self.models = SimpleNamespace(
+            generate_content=self.generate_content, generate_content_stream=self.generate_content_stream
+        )
+
+    # ---- Synchronous facade (what ManagedChat calls) ----
+    def run(self, coro):
+        """Run a coroutine on the client's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def generate_content(self, model=None, contents=None, config=None):
+        return self.run(self.generate(model, contents, config))
+
+    def generate_content_stream(self, model=None, contents=None, config=None):
+        chunks = self.generate_stream(model, contents, config)
+
+        async def next_chunk():
+            return await chunks.__anext__()
+
+        try:
+            while True:
+                try:
+                    yield self.run(next_chunk())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(chunks.aclose())
+
+    # ---- Async API ----
+    async def generate(self, model, contents, config=None):
+        kwargs = {"model": model, "contents": contents, "config": config}
+        return await self._with_retries(lambda: self._call(kwargs), "full")
+
+    async def generate_stream(self, model, contents, config=None):
+        """Retries and hedges apply until the first chunk; after that the stream is only bounded by the deadline."""
+        kwargs = {"model": model, "contents": contents, "config": config}
+        end = time.monotonic() + self.deadline
+        stream, first = await self._with_retries(lambda: self._open_stream(kwargs), "first_chunk", end)
+        try:
+            yield first
+            while True:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    raise LLMUnavailable(f"reply still streaming after the {self.deadline:.0f}s deadline")
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), remaining)
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    self._count("timeouts")
+                    raise LLMUnavailable(f"reply still streaming after the {self.deadline:.0f}s deadline")
+                yield chunk
+        finally:
+            await _close(stream)
+
+    # ---- Attempts ----
+    async def _call(self, kwargs):
+        if self._async is not None:
+            return await self._async.models.generate_content(**kwargs)
+        return await asyncio.to_thread(self.client.models.generate_content, **kwargs)
+
+    async def _open_stream(self, kwargs):
+        """Start a stream and wait for its first chunk; returns (stream, first chunk)."""
+        if self._async is not None:
+            stream = await self._async.models.generate_content_stream(**kwargs)
+        else:
+            stream = _ThreadStream(await asyncio.to_thread(self.client.models.generate_content_stream, **kwargs))
+        try:
+            return stream, await stream.__anext__()
+        except BaseException:
+            await _close(stream)
+            raise
+
+    def hedge_delay(self, kind):
+        """p95 of recent latencies, or None until there are enough of them."""
+        samples = self._latencies[kind]
+        if not self.hedge or len(samples) < self.hedge_min_samples:
+            return None
+        return max(float(np.percentile(samples, 95)), self.hedge_floor)
+
+    async def _timed(self, attempt, kind):
+        start = time.monotonic()
+        result = await attempt()
+        self._latencies[kind].append(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, attempt, kind):
+        tasks = [asyncio.ensure_future(self._timed(attempt, kind))]
+        winner = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(kind))
+            if not done:
+                self._count("hedges")
+                tasks.append(asyncio.ensure_future(self._timed(attempt, kind)))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        if task is not tasks[0]:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            losers = [task for task in tasks if task is not winner]
+            for task in losers:
+                task.cancel()
+            for task in losers:
+                # A loser that got its stream open before being cancelled must still close it
+                try:
+                    result = await task
+                except BaseException:
+                    continue
+                if kind == "first_chunk":
+                    await _close(result[0])
+
+    async def _with_retries(self, attempt, kind, end=None):
+        if not self.breaker.allow():
+            self._count("short_circuits")
+            raise CircuitOpen("LLM circuit breaker is open")
+        self._count("requests")
+        end = end or time.monotonic() + self.deadline
+        error = None
+        for n in range(self.retries + 1):
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                result = await asyncio.wait_for(self._hedged(attempt, kind), min(self.attempt_timeout, remaining))
+                self.breaker.success()
+                return result
+            except asyncio.TimeoutError:
+                self._count("timeouts")
+                error = TimeoutError(f"no response within {min(self.attempt_timeout, remaining):.1f}s")
+            except Exception as e:
+                if not _retryable(e):
+                    raise
+                error = e
+            if n < self.retries:
+                self._count("retries")
+                await asyncio.sleep(min(random.uniform(0, self.backoff * 2 ** n), max(end - time.monotonic(), 0)))
+        self._count("failures")
+        self.breaker.failure()
+        raise LLMUnavailable(f"LLM request failed: {error or 'deadline reached'}") from error
+
+    def _count(self, name):
+        self.stats[name] += 1
+        tracing.record(f"llm_{name}", 1)
+
+
+def make_genai_client(api_key, base_url=None, timeout=None):
+    """genai.Client, optionally pointed at mock_llm_server.py; `timeout` is in seconds."""
+    from google import genai
+    from google.genai import types
+
+    options = {}
+    if base_url:
+        options["base_url"] = base_url
+    if timeout:
+        options["timeout"] = int(timeout * 1000)
+    return genai.Client(api_key=api_key, http_options=types.HttpOptions(**options) if options else None)
+
+
+async def _load(client, n, concurrency):
+    """Send `n` short requests, `concurrency` at a time; returns per-request latencies (None = failed)."""
+    latencies = []
+    gate = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with gate:
+            start = time.monotonic()
+            try:
+                await client.generate("gemini-2.0-flash-exp", f"Question {i}: tell me about yourself.")
+                latencies.append(time.monotonic() - start)
+            except LLMUnavailable:
+                latencies.append(None)
+
+    await asyncio.gather(*(one(i) for i in range(n)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8765", help="mock_llm_server.py address")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    rows = []
+    for name, options in [
+        ("single attempt", {"retries": 0, "hedge": False, "breaker_failures": 10 ** 9}),
+        ("retries", {"hedge": False}),
+        ("retries + hedging", {}),
+    ]:
+        client = ResilientClient(make_genai_client("mock", args.base_url), **options)
+        latencies = client.run(_load(client, args.requests, args.concurrency))
+        ok = [x for x in latencies if x is not None]
+        p50, p95, p99 = np.percentile(ok, [50, 95, 99]) if ok else (float("nan"),) * 3
+        rows.append((name, len(ok) / len(latencies), p50, p95, p99, client.stats))
+
+    print(f"{'client':<20}{'success':>9}{'p50':>8}{'p95':>8}{'p99':>8}  hedges/retries")
+    for name, success, p50, p95, p99, stats in rows:
+        print(f"{name:<20}{success * 100:>8.1f}%{p50:>8.2f}{p95:>8.2f}{p99:>8.2f}  {stats['hedges']}/{stats['retries']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,14 @@
+import argparse
+import os
+import secrets
+import shutil
 import subprocess
 import sys
+import tempfile
+import time
+
+import readiness
+import supervisor
 
 # Programs to run
 programs = [
@@ -8,15 +17,85 @@ programs = [
     "tts.py"
 ]
 
+# Hand-off mode: "bus" (Unix sockets, default) or "files" (input.txt / chat_output.txt polling)
+IPC_MODE = os.environ.get("COACH_IPC", "bus")
+STARTUP_TIMEOUT = 600  # seconds to wait for every stage to load and warm up
+
+parser = argparse.ArgumentParser(description="Start the interview coach pipeline.")
+parser.add_argument("--supervise", action="store_true",
+                    help="restart crashed stages and pin them to CPU cores (see partition.json)")
+parser.add_argument("--config", help="supervisor config: per-stage CPU sets, thread budgets, restart policy "
+                                      "(default: partition.json)")
+args = parser.parse_args()
+
 processes = []
+env = os.environ.copy()
+run_dir = tempfile.mkdtemp(prefix="coach-")
+env["COACH_READY_DIR"] = os.path.join(run_dir, "ready")
+os.environ["COACH_READY_DIR"] = env["COACH_READY_DIR"]
+
+if IPC_MODE == "bus":
+    env["COACH_BUS_DIR"] = run_dir
+    env["COACH_BUS_KEY"] = secrets.token_hex(16)
+    print(f"🔌 Message bus at {run_dir}")
+else:
+    env.pop("COACH_BUS_DIR", None)
+    print("📄 Using file hand-off (input.txt / chat_output.txt)")
+
+
+def wait_until_ready():
+    """Wait for every stage to report ready, printing each stage's startup time."""
+    start = time.time()
+    reported = set()
+    while time.time() - start < STARTUP_TIMEOUT:
+        for stage, info in readiness.status().items():
+            if stage not in reported:
+                reported.add(stage)
+                timings = " ".join(f"{k} {v:.1f}s" for k, v in info.items() if k not in ("stage", "pid", "t"))
+                print(f"🟢 {stage} ready after {info['t'] - start:.1f}s ({timings})")
+        if len(reported) == len(readiness.STAGES):
+            print(f"✅ Pipeline ready in {time.time() - start:.1f}s")
+            return True
+        if any(p.poll() is not None for p in processes):
+            print("❌ A stage exited during startup")
+            return False
+        time.sleep(0.2)
+    print(f"⚠️ Not ready after {STARTUP_TIMEOUT}s: {sorted(set(readiness.STAGES) - reported)}")
+    return False
+
+
+if args.supervise or args.config:
+    # All stages start at once; the supervisor keeps them within their cores and running
+    config_path = args.config or ("partition.json" if os.path.exists("partition.json") else None)
+    sup = supervisor.Supervisor(programs, env, supervisor.load_config(config_path))
+    try:
+        sup.start()
+        processes = [stage.process for stage in sup.stages]
+        if wait_until_ready():
+            print("✅ All programs launched under supervision. Press CTRL+C to stop.")
+        exit_code = sup.run()
+    except KeyboardInterrupt:
+        sup.shutdown()
+        exit_code = 0
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    sys.exit(exit_code)
 
 try:
+    # All stages start at once so their models load in parallel
     for prog in programs:
         print(f"🔄 Starting {prog} ...")
-        # run each in parallel
-        p = subprocess.Popen([sys.executable, prog])
+        p = subprocess.Popen([sys.executable, prog], env=env)
         processes.append(p)
 
+    if not wait_until_ready():
+        print("🛑 Startup failed; stopping the other programs")
+        for p in processes:
+            if p.poll() is None:
+                p.terminate()
+        for p in processes:
+            p.wait()
+        sys.exit(1)
     print("✅ All programs launched. Press CTRL+C to stop.")
 
     # Keep script alive until user interrupts
@@ -26,4 +105,6 @@ try:
 except KeyboardInterrupt:
     print("\n⏹️ Stopping all programs...")
     for p in processes:
-        p.terminate()
\ No newline at end of file
+        p.terminate()
+finally:
+    shutil.rmtree(run_dir, ignore_errors=True)
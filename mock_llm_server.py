@@ -0,0 +1,155 @@
+# mock_llm_server.py
+"""Local stand-in for the Gemini REST API with latency and error injection.
+
+Answers generateContent and streamGenerateContent (SSE) with the canned
+interviewer replies from fake_llm.py, so the real genai client, and
+llm_client.ResilientClient on top of it, can be exercised offline:
+
+    python mock_llm_server.py --latency 0.4 --slow-rate 0.05 --slow-latency 5 --error-rate 0.05
+    COACH_LLM_BASE_URL=http://127.0.0.1:8765 GOOGLE_API_KEY=mock python file_chat.py
+
+The injection settings can be changed while it runs:
+
+    curl -X POST http://127.0.0.1:8765/_config -d '{"error_rate": 1.0}'
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fake_llm import REPLIES
+
+ROUTE = re.compile(r"/models/([^/:]+):(generateContent|streamGenerateContent)")
+
+settings = {
+    "latency": 0.3,        # seconds before the first token
+    "jitter": 0.1,         # +/- uniform noise on the latency
+    "token_delay": 0.02,   # seconds between streamed tokens
+    "slow_rate": 0.0,      # fraction of requests that take `slow_latency` instead
+    "slow_latency": 5.0,
+    "error_rate": 0.0,     # fraction answered with `error_code`
+    "error_code": 503,
+    "hang_rate": 0.0,      # fraction that never answer
+}
+stats = {"requests": 0, "errors": 0, "slow": 0, "hangs": 0}
+_replies = itertools.cycle(REPLIES)
+_lock = threading.Lock()
+
+
+def _prompt_text(body):
+    parts = [p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", [])]
+    return " ".join(parts)
+
+
+def _chunk(text, prompt_tokens=None, done=False):
+    chunk = {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}]}
+    if done:
+        chunk["candidates"][0]["finishReason"] = "STOP"
+        chunk["usageMetadata"] = {"promptTokenCount": prompt_tokens, "candidatesTokenCount": 0,
+                                  "totalTokenCount": prompt_tokens}
+    return chunk
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, so connection reuse is visible
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, code, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.startswith("/_config"):
+            self._json(200, {"settings": settings, "stats": stats})
+        else:
+            self._json(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path.startswith("/_config"):
+            settings.update({k: v for k, v in body.items() if k in settings})
+            return self._json(200, {"settings": settings})
+        route = ROUTE.search(self.path)
+        if not route:
+            return self._json(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+
+        with _lock:
+            stats["requests"] += 1
+            roll = random.random()
+            reply = next(_replies)
+        if roll < settings["hang_rate"]:
+            stats["hangs"] += 1
+            time.sleep(3600)
+            return
+        roll -= settings["hang_rate"]
+        if roll < settings["error_rate"]:
+            stats["errors"] += 1
+            code = int(settings["error_code"])
+            return self._json(code, {"error": {"code": code, "message": "injected error", "status": "UNAVAILABLE"}})
+        roll -= settings["error_rate"]
+        if roll < settings["slow_rate"]:
+            stats["slow"] += 1
+            delay = settings["slow_latency"]
+        else:
+            delay = settings["latency"] + random.uniform(-1, 1) * settings["jitter"]
+        time.sleep(max(delay, 0.0))
+
+        prompt_tokens = max(1, len(_prompt_text(body)) // 4)
+        if route.group(2) == "generateContent":
+            return self._json(200, _chunk(reply, prompt_tokens, done=True))
+
+        # Server-sent events, one token per event
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        tokens = re.findall(r"\S+\s*", reply)
+        try:
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(settings["token_delay"])
+                event = f"data: {json.dumps(_chunk(token, prompt_tokens, done=i == len(tokens) - 1))}\r\n\r\n".encode()
+                self.wfile.write(f"{len(event):x}\r\n".encode() + event + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # the client gave up (deadline or lost hedge)
+
+
+def serve(port, host="127.0.0.1"):
+    """Start the server in a background thread and return it."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    for name, value in settings.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+    settings.update({name: getattr(args, name) for name in settings})
+
+    serve(args.port)
+    print(f"🧪 Mock Gemini API on http://127.0.0.1:{args.port} {settings}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(f"⏹️ Stopped. {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# playback.py
+import collections
+import threading
+import time
+
+import numpy as np
+
+
+class Playback:
+    """One queued clip; wait() returns True if it played to the end, False if it was cancelled."""
+
+    def __init__(self, samples):
+        self.samples = samples
+        self.pos = 0
+        self.cancelled = False
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        self.done.wait(timeout)
+        return self.done.is_set() and not self.cancelled
+
+
+class _NullStream:
+    """Stands in for an output stream when there are no speakers: consumes audio in real time."""
+
+    def __init__(self, samplerate, blocksize, callback):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.callback = callback
+        self._running = False
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._loop, daemon=True).start()
+
+    def _loop(self):
+        out = np.zeros((self.blocksize, 1), dtype=np.int16)
+        period = self.blocksize / self.samplerate
+        next_tick = time.perf_counter()
+        while self._running:
+            self.callback(out, self.blocksize, None, None)
+            next_tick += period
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    def stop(self):
+        self._running = False
+
+    def close(self):
+        self.stop()
+
+
+class PlaybackEngine:
+    """Plays int16 sample arrays on a dedicated output stream without blocking the caller.
+
+    play() queues a clip and returns immediately. The stream callback copies
+    `block_ms` of audio at a time from the head of the queue, so cancel()
+    (drop everything, including the clip that is playing) takes effect at
+    the next block, within a few tens of milliseconds. flush() drops only
+    what hasn't started yet. With `null=True` nothing reaches the speakers,
+    but clips still take their real duration (for benchmarks and headless runs).
+    """
+
+    def __init__(self, sample_rate, block_ms=10, device=None, null=False):
+        self.sample_rate = sample_rate
+        self.blocksize = max(1, int(sample_rate * block_ms / 1000))
+        self._queue = collections.deque()
+        self._lock = threading.Lock()
+        if null:
+            self._stream = _NullStream(sample_rate, self.blocksize, self._callback)
+        else:
+            import sounddevice as sd
+            self._stream = sd.OutputStream(
+                samplerate=sample_rate, channels=1, dtype="int16", blocksize=self.blocksize,
+                latency="low", device=device, callback=self._callback,
+            )
+        self._stream.start()
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        filled = 0
+        with self._lock:
+            while filled < frames and self._queue:
+                clip = self._queue[0]
+                n = min(frames - filled, len(clip.samples) - clip.pos)
+                out[filled:filled + n] = clip.samples[clip.pos:clip.pos + n]
+                clip.pos += n
+                filled += n
+                if clip.pos >= len(clip.samples):
+                    self._queue.popleft()
+                    clip.done.set()
+        out[filled:] = 0
+
+    def play(self, samples):
+        """Queue mono audio (int16, or float in [-1, 1]) and return its Playback."""
+        samples = np.asarray(samples)
+        if samples.dtype != np.int16:
+            samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+        clip = Playback(samples.reshape(-1))
+        if not len(clip.samples):
+            clip.done.set()
+            return clip
+        with self._lock:
+            self._queue.append(clip)
+        return clip
+
+    def _drop(self, clips):
+        for clip in clips:
+            clip.cancelled = True
+            clip.done.set()
+        return len(clips)
+
+    def cancel(self):
+        """Stop the clip that is playing and drop the queue; returns how many clips were cut."""
+        with self._lock:
+            clips = list(self._queue)
+            self._queue.clear()
+        return self._drop(clips)
+
+    def flush(self):
+        """Drop queued clips but let the one that is playing finish."""
+        with self._lock:
+            clips = list(self._queue)[1:]
+            while len(self._queue) > 1:
+                self._queue.pop()
+        return self._drop(clips)
+
+    @property
+    def busy(self):
+        with self._lock:
+            return bool(self._queue)
+
+    def close(self):
+        self.cancel()
+        self._stream.stop()
+        self._stream.close()
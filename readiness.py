@@ -0,0 +1,50 @@
+# readiness.py
+import json
+import os
+import time
+
+# Pipeline stages, as they report themselves
+STAGES = ("chat", "app", "tts")
+
+
+def ready_dir():
+    """Directory where stages report readiness, set up by main.py."""
+    return os.environ.get("COACH_READY_DIR")
+
+
+def mark_ready(stage, **timings):
+    """Report that `stage` has loaded and warmed up its model."""
+    print(f"✅ {stage} ready " + " ".join(f"{k}={v:.2f}s" for k, v in timings.items()))
+    if not ready_dir():
+        return
+    os.makedirs(ready_dir(), exist_ok=True)
+    path = os.path.join(ready_dir(), f"{stage}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"stage": stage, "pid": os.getpid(), "t": time.time(), **timings}, f)
+    os.replace(tmp, path)
+
+
+def status(stages=STAGES):
+    """Readiness reports of the stages that are ready so far."""
+    reports = {}
+    for stage in stages:
+        try:
+            with open(os.path.join(ready_dir(), f"{stage}.json"), "r", encoding="utf-8") as f:
+                reports[stage] = json.load(f)
+        except (OSError, TypeError, ValueError):
+            pass
+    return reports
+
+
+def pipeline_ready(stages=STAGES):
+    """True once every stage is ready (always True when not launched by main.py)."""
+    return not ready_dir() or len(status(stages)) == len(stages)
+
+
+def clear(stage):
+    if ready_dir():
+        try:
+            os.remove(os.path.join(ready_dir(), f"{stage}.json"))
+        except FileNotFoundError:
+            pass
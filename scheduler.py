@@ -0,0 +1,89 @@
+# scheduler.py
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import tracing
+
+
+class SchedulerBusy(Exception):
+    """Raised when the transcription queue is full."""
+
+
+class TranscriptionScheduler:
+    """Shares one WhisperModel between all browser sessions.
+
+    Requests are queued (bounded, so waiting time stays bounded). The
+    dispatcher collects whatever arrives within `batch_window`, orders the
+    batch shortest-first and hands it to `num_workers` threads as they free
+    up, so up to `max_queue + max_batch` requests can be waiting at once;
+    each one's wait is recorded as "transcribe_queue_wait". The model
+    should be created with the same `num_workers` so CTranslate2 decodes
+    them in parallel instead of one after another.
+
+    transcribe() has the same signature as WhisperModel.transcribe but
+    returns the segments as a list, so it can be used in place of the model.
+    With a `policy` (decoding.DecodingPolicy), decoding goes through it.
+    """
+
+    def __init__(self, model, policy=None, num_workers=2, max_batch=4, max_queue=16, batch_window=0.02):
+        self.model = model
+        self.policy = policy
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._queue = queue.Queue(max_queue)
+        self._slots = threading.Semaphore(num_workers)
+        self._pool = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="whisper")
+        self.stats = {"requests": 0, "batches": 0, "max_batch": 0, "max_wait": 0.0}
+        threading.Thread(target=self._dispatch_loop, daemon=True).start()
+
+    def submit(self, audio, **options):
+        """Queue a transcription and return a Future of (segments, info)."""
+        future = Future()
+        try:
+            self._queue.put_nowait((future, audio, options, time.monotonic()))
+        except queue.Full:
+            raise SchedulerBusy("Transcription queue is full")
+        return future
+
+    def transcribe(self, audio, timeout=None, **options):
+        return self.submit(audio, **options).result(timeout)
+
+    def _dispatch_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self.stats["batches"] += 1
+            self.stats["requests"] += len(batch)
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+            batch.sort(key=lambda item: len(item[1]))
+            for item in batch:
+                self._slots.acquire()
+                self._pool.submit(self._run, *item)
+
+    def _run(self, future, audio, options, enqueued):
+        try:
+            wait = time.monotonic() - enqueued
+            self.stats["max_wait"] = max(self.stats["max_wait"], wait)
+            tracing.record("transcribe_queue_wait", wait)
+            if future.set_running_or_notify_cancel():
+                if self.policy is not None:
+                    future.set_result(self.policy.transcribe(self.model, audio, **options))
+                else:
+                    segments, info = self.model.transcribe(audio, **options)
+                    # Segments are generated lazily; decode them here, on the worker
+                    future.set_result((list(segments), info))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self._slots.release()
@@ -0,0 +1,178 @@
+# session_store.py
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    turns INTEGER NOT NULL DEFAULT 0,
+    audio_seconds REAL NOT NULL DEFAULT 0,
+    rating TEXT,
+    feedback TEXT
+);
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    idx INTEGER NOT NULL,
+    turn TEXT,
+    created_at REAL NOT NULL,
+    transcript TEXT NOT NULL,
+    audio_offset INTEGER NOT NULL,
+    audio_samples INTEGER NOT NULL,
+    timings TEXT NOT NULL DEFAULT '{}'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS turns_by_session ON turns(session_id, idx);
+CREATE INDEX IF NOT EXISTS turns_by_trace ON turns(turn);
+CREATE TABLE IF NOT EXISTS replies (
+    turn TEXT PRIMARY KEY,
+    reply TEXT NOT NULL,
+    timings TEXT NOT NULL DEFAULT '{}'
+);
+"""
+
+
+def sessions_enabled():
+    """Sessions are saved unless COACH_SAVE_SESSIONS=0."""
+    return os.environ.get("COACH_SAVE_SESSIONS", "1") != "0"
+
+
+def session_dir():
+    """Where sessions are kept (COACH_SESSION_DIR, default ./sessions)."""
+    return os.environ.get("COACH_SESSION_DIR", "sessions")
+
+
+def to_int16(audio):
+    """float32 in [-1, 1] to int16 PCM, half the size on disk."""
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+class SessionStore:
+    """Practice sessions: an SQLite index plus one raw int16 audio file per session.
+
+    Each turn is a row with the transcript, the interviewer's reply and the
+    stage timings, and points at its slice of the session's audio file.
+    Audio is appended as it arrives and read back through np.memmap, so
+    listing sessions or showing a transcript never touches it. app.py writes
+    the turns; file_chat.py writes the replies, keyed by turn id, from its
+    own process (SQLite's WAL mode allows this), so either may land first.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or session_dir()
+        self.audio_dir = os.path.join(self.root, "audio")
+        os.makedirs(self.audio_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.root, "index.db"), timeout=10, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def audio_path(self, session_id):
+        return os.path.join(self.audio_dir, f"{session_id}.pcm")
+
+    # ---- Writing ----
+    def start_session(self):
+        with self._lock, self._db:
+            return self._db.execute("INSERT INTO sessions (started_at) VALUES (?)", (time.time(),)).lastrowid
+
+    def add_turn(self, session_id, transcript, audio, turn=None, **timings):
+        """Append a turn; `audio` is float32 at SAMPLE_RATE. Returns the turn's index."""
+        pcm = to_int16(audio)
+        path = self.audio_path(session_id)
+        with self._lock:
+            with open(path, "ab") as f:
+                offset = f.tell() // pcm.itemsize
+                f.write(pcm.tobytes())
+            with self._db:
+                idx = self._db.execute(
+                    "SELECT turns FROM sessions WHERE id = ?", (session_id,)
+                ).fetchone()["turns"]
+                self._db.execute(
+                    "INSERT INTO turns (session_id, idx, turn, created_at, transcript, audio_offset, audio_samples, timings)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (session_id, idx, turn, time.time(), transcript, offset, len(pcm), json.dumps(timings)),
+                )
+                self._db.execute(
+                    "UPDATE sessions SET turns = turns + 1, audio_seconds = audio_seconds + ? WHERE id = ?",
+                    (len(pcm) / SAMPLE_RATE, session_id),
+                )
+        return idx
+
+    def set_reply(self, turn, reply, **timings):
+        """Record the interviewer's reply to a turn (the latest unanswered one if `turn` is None)."""
+        with self._lock, self._db:
+            if turn is None:
+                row = self._db.execute(
+                    "SELECT turn FROM turns WHERE turn IS NOT NULL AND turn NOT IN (SELECT turn FROM replies)"
+                    " ORDER BY id DESC LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    return False
+                turn = row["turn"]
+            self._db.execute(
+                "INSERT OR REPLACE INTO replies (turn, reply, timings) VALUES (?, ?, ?)",
+                (turn, reply, json.dumps(timings)),
+            )
+            return True
+
+    def finish_session(self, session_id, rating=None, feedback=None):
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE sessions SET ended_at = ?, rating = ?, feedback = ? WHERE id = ?",
+                (time.time(), rating, feedback, session_id),
+            )
+
+    # ---- Reading ----
+    def count_sessions(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sessions WHERE turns > 0").fetchone()[0]
+
+    def list_sessions(self, page=0, per_page=20):
+        """One page of sessions with at least one turn, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT * FROM sessions WHERE turns > 0 ORDER BY id DESC LIMIT ? OFFSET ?",
+                (per_page, page * per_page),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def get_turns(self, session_id):
+        """Transcripts, replies and timings of a session (no audio)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT t.*, r.reply, r.timings AS reply_timings FROM turns t"
+                " LEFT JOIN replies r ON r.turn = t.turn WHERE t.session_id = ? ORDER BY t.idx",
+                (session_id,),
+            ).fetchall()
+        turns = []
+        for r in rows:
+            turn = dict(r)
+            turn["timings"] = {**json.loads(turn["timings"]), **json.loads(turn.pop("reply_timings") or "{}")}
+            turns.append(turn)
+        return turns
+
+    def turn_audio(self, session_id, idx):
+        """A turn's audio as a read-only int16 memmap (None if the turn doesn't exist)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT audio_offset, audio_samples FROM turns WHERE session_id = ? AND idx = ?", (session_id, idx)
+            ).fetchone()
+        if row is None or not row["audio_samples"]:
+            return None
+        return np.memmap(
+            self.audio_path(session_id), dtype=np.int16, mode="r",
+            offset=row["audio_offset"] * np.dtype(np.int16).itemsize, shape=(row["audio_samples"],),
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,87 @@
+# streaming.py
+import threading
+
+import numpy as np
+
+
+class StreamingTranscriber:
+    """Incremental Whisper transcription over a growing recording.
+
+    Each update decodes only the audio after the last committed segment.
+    Segments that two consecutive passes agree on are committed and never
+    decoded again, so finalize() only has to decode the uncommitted tail.
+    """
+
+    def __init__(self, model, sample_rate=16000, window=15.0, min_chunk=1.0, prompt_chars=200, **decode_options):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.window_samples = int(window * sample_rate)
+        self.min_samples = int(min_chunk * sample_rate)
+        self.prompt_chars = prompt_chars
+        self.decode_options = decode_options
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget all committed text and start a new recording."""
+        with self._lock:
+            self._committed = []          # committed segment texts
+            self._committed_samples = 0   # audio offset covered by committed text
+            self._previous = []           # uncommitted segments from the last pass
+            self._finalized = False
+
+    def _decode(self, audio):
+        prompt = " ".join(self._committed)[-self.prompt_chars:] or None
+        segments, _ = self.model.transcribe(audio, initial_prompt=prompt, **self.decode_options)
+        return [s for s in segments if s.text.strip()]
+
+    def _render(self, tentative=()):
+        return "\n".join(self._committed + [s.text for s in tentative])
+
+    def _pending(self, audio, offset):
+        # `offset` is the recording position of audio[0] (non-zero once old audio was dropped)
+        start = max(self._committed_samples - offset, 0)
+        self._committed_samples = max(self._committed_samples, offset)
+        return audio[start:]
+
+    def update(self, audio, offset=0):
+        """Decode the uncommitted part of `audio` and return the partial text.
+
+        Returns None once the transcriber has been finalized.
+        """
+        with self._lock:
+            if self._finalized:
+                return None
+            pending = self._pending(audio, offset)
+            if len(pending) < self.min_samples:
+                return self._render(self._previous)
+
+            segments = self._decode(pending)
+
+            # Commit the leading segments both passes agree on; the last one stays open
+            stable = 0
+            for prev, seg in zip(self._previous, segments[:-1]):
+                if prev.text.strip() != seg.text.strip():
+                    break
+                stable += 1
+            # Window full: force-commit everything but the last segment
+            if stable == 0 and len(pending) > self.window_samples:
+                stable = max(len(segments) - 1, 0)
+
+            if stable:
+                self._committed.extend(s.text for s in segments[:stable])
+                self._committed_samples += int(segments[stable - 1].end * self.sample_rate)
+            self._previous = segments[stable:]
+            return self._render(self._previous)
+
+    def finalize(self, audio, offset=0):
+        """Decode the remaining tail of `audio` and return the full transcript."""
+        with self._lock:
+            if self._finalized:
+                return self._render()
+            self._finalized = True
+            pending = self._pending(audio, offset)
+            if len(pending) >= self.sample_rate // 10:
+                self._committed.extend(s.text for s in self._decode(np.ascontiguousarray(pending)))
+            self._previous = []
+            return self._render()
@@ -0,0 +1,278 @@
+# supervisor.py
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+import readiness
+
+# Readiness name of each program
+STAGE_NAMES = {"file_chat.py": "chat", "app.py": "app", "tts.py": "tts"}
+
+# Thread pools every stage's libraries size from the environment
+THREAD_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+# ...and the stage-specific knobs for the models that take a thread count explicitly
+# (the whole stage's budget; app.py splits it across its parallel Whisper decodes)
+STAGE_THREAD_VARS = {"app.py": "COACH_WHISPER_THREADS", "tts.py": "COACH_TTS_THREADS"}
+
+DEFAULT_CONFIG = {
+    "stages": {},                 # program -> {"cpus": "0-3" | "share": 0.5, "threads": n, "health_url": url}
+    "health_interval": 2.0,       # seconds between health checks
+    "health_failures": 3,         # failed URL checks in a row before a restart
+    "startup_timeout": 600.0,     # seconds a (re)started stage may take to report ready
+    "restart_backoff": 1.0,       # first restart delay, doubled per crash in a row
+    "max_backoff": 30.0,
+    "max_restarts": 5,            # crashes in a row before giving up
+    "stable_after": 60.0,         # a stage that ran this long starts its crash count over
+    "shutdown_grace": 10.0,       # seconds to exit after Ctrl+C before being killed
+}
+
+
+def load_config(path=None):
+    config = json.loads(json.dumps(DEFAULT_CONFIG))
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            user = json.load(f)
+        config.update({k: v for k, v in user.items() if k != "stages"})
+        config["stages"].update(user.get("stages", {}))
+    return config
+
+
+def parse_cpus(spec):
+    """'0-3,6' -> {0, 1, 2, 3, 6}"""
+    cpus = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-")
+            cpus.update(range(int(lo), int(hi) + 1))
+        elif part:
+            cpus.add(int(part))
+    return cpus
+
+
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _apportion(targets, total):
+    """Whole cores for fractional `targets`: at least one each, the rest by largest remainder, `total` in all."""
+    counts = [1] * len(targets)
+    spare = total - len(targets)
+    excess = [max(target - 1, 0.0) for target in targets]
+    if spare <= 0 or not sum(excess):
+        return counts
+    exact = [e * spare / max(sum(excess), spare) for e in excess]
+    extra = [int(e) for e in exact]
+    by_remainder = sorted(range(len(targets)), key=lambda i: exact[i] - extra[i], reverse=True)
+    for i in by_remainder[:round(sum(exact)) - sum(extra)]:
+        extra[i] += 1
+    return [c + e for c, e in zip(counts, extra)]
+
+
+def plan(config, programs, cpus=None):
+    """CPU set and thread budget of each program.
+
+    Stages with "cpus" get exactly those; stages with a "share" split the
+    remaining cores in proportion, at least one each and without overlap as
+    long as there are enough cores (with fewer cores than stages they wrap
+    around). Unlisted stages are left alone (None). "threads" defaults to
+    the number of cores in the set.
+    """
+    cpus = cpus or available_cpus()
+    stages = {prog: config["stages"].get(prog) for prog in programs}
+    fixed = {prog: parse_cpus(s["cpus"]) & set(cpus) or set(cpus) for prog, s in stages.items() if s and "cpus" in s}
+    pool = [c for c in cpus if not any(c in f for f in fixed.values())] or list(cpus)
+    shared = [prog for prog, s in stages.items() if s and "cpus" not in s]
+    shares = [stages[prog].get("share", 1.0) for prog in shared]
+    total = min(len(pool), max(len(shared), round(sum(shares) * len(pool))))
+    counts = dict(zip(shared, _apportion([share * len(pool) for share in shares], total)))
+
+    result = {}
+    next_cpu = 0
+    for prog, stage in stages.items():
+        if not stage:
+            result[prog] = None
+            continue
+        if prog in fixed:
+            assigned = fixed[prog]
+        else:
+            assigned = {pool[(next_cpu + i) % len(pool)] for i in range(counts[prog])}
+            next_cpu += counts[prog]
+        result[prog] = {"cpus": assigned, "threads": int(stage.get("threads", len(assigned)))}
+    return result
+
+
+def stage_env(env, prog, budget):
+    """Copy of `env` that keeps `prog`'s thread pools within its budget."""
+    env = dict(env)
+    if budget:
+        threads = str(budget["threads"])
+        for var in THREAD_VARS:
+            env[var] = threads
+        if prog in STAGE_THREAD_VARS:
+            env[STAGE_THREAD_VARS[prog]] = threads
+    return env
+
+
+def launch(prog, env, budget=None, **popen_args):
+    """Start a stage pinned to its CPU set (Linux; elsewhere only the thread budget applies)."""
+    pin = None
+    if budget and hasattr(os, "sched_setaffinity"):
+        def pin():
+            os.sched_setaffinity(0, budget["cpus"])   # before exec, so every thread inherits it
+    return subprocess.Popen([sys.executable, prog], env=stage_env(env, prog, budget), preexec_fn=pin, **popen_args)
+
+
+def describe(budget):
+    if not budget:
+        return "all cores, default threads"
+    cpus = ",".join(str(c) for c in sorted(budget["cpus"]))
+    return f"cpus {cpus}, {budget['threads']} threads"
+
+
+def _healthy(url, timeout=2.0):
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status < 500
+    except Exception:
+        return False
+
+
+class Stage:
+    def __init__(self, prog, budget, health_url=None):
+        self.prog = prog
+        self.name = STAGE_NAMES.get(prog, prog)
+        self.budget = budget
+        self.health_url = health_url
+        self.process = None
+        self.started_at = 0.0
+        self.crashes = 0          # in a row
+        self.restart_at = None    # when a crashed stage is due to be started again
+        self.failed_checks = 0
+        self.restarts = 0
+
+
+class Supervisor:
+    """Runs the pipeline stages, pinned to their cores, and keeps them running.
+
+    Every `health_interval` seconds it checks that each stage is alive, that
+    it reported ready within `startup_timeout`, and (for stages with a
+    "health_url") that it answers HTTP. A failed stage is restarted after an
+    exponential backoff; after `max_restarts` crashes in a row the whole
+    pipeline is stopped. stop() (or SIGINT/SIGTERM) asks every stage to exit
+    with SIGINT, then terminates whatever is left after `shutdown_grace`.
+    """
+
+    def __init__(self, programs, env, config):
+        self.env = env
+        self.config = config
+        budgets = plan(config, programs)
+        self.stages = [
+            Stage(prog, budgets[prog], (config["stages"].get(prog) or {}).get("health_url")) for prog in programs
+        ]
+        self.stopping = False
+
+    def start(self):
+        for stage in self.stages:
+            self._spawn(stage)
+
+    def _spawn(self, stage):
+        readiness.clear(stage.name)
+        print(f"🔄 Starting {stage.prog} ({describe(stage.budget)}) ...")
+        # Own process group, so Ctrl+C reaches the supervisor only and it decides the order
+        stage.process = launch(stage.prog, self.env, stage.budget, start_new_session=True)
+        stage.started_at = time.monotonic()
+        stage.restart_at = None
+        stage.failed_checks = 0
+
+    def _kill(self, stage):
+        if stage.process and stage.process.poll() is None:
+            stage.process.terminate()
+            try:
+                stage.process.wait(5)
+            except subprocess.TimeoutExpired:
+                stage.process.kill()
+                stage.process.wait()
+
+    def _failed(self, stage, reason):
+        """Schedule a restart; returns False when the stage keeps crashing."""
+        print(f"❌ {stage.prog} {reason}")
+        self._kill(stage)
+        if time.monotonic() - stage.started_at > self.config["stable_after"]:
+            stage.crashes = 0
+        stage.crashes += 1
+        if stage.crashes > self.config["max_restarts"]:
+            print(f"🛑 {stage.prog} failed {stage.crashes} times in a row; giving up")
+            return False
+        delay = min(self.config["restart_backoff"] * 2 ** (stage.crashes - 1), self.config["max_backoff"])
+        print(f"⏳ Restarting {stage.prog} in {delay:.1f}s")
+        stage.restart_at = time.monotonic() + delay
+        stage.process = None
+        return True
+
+    def check(self):
+        """One round of health checks; returns False if the pipeline can't be kept up."""
+        ready = readiness.status([s.name for s in self.stages])
+        now = time.monotonic()
+        for stage in self.stages:
+            if stage.process is None:
+                if now >= stage.restart_at:
+                    stage.restarts += 1
+                    self._spawn(stage)
+                continue
+            code = stage.process.poll()
+            if code is not None:
+                ok = self._failed(stage, f"exited with code {code}")
+            elif stage.name not in ready:
+                if now - stage.started_at <= self.config["startup_timeout"]:
+                    continue
+                ok = self._failed(stage, f"not ready after {self.config['startup_timeout']:.0f}s")
+            elif stage.health_url and not _healthy(stage.health_url):
+                stage.failed_checks += 1
+                if stage.failed_checks < self.config["health_failures"]:
+                    continue
+                ok = self._failed(stage, f"failed {stage.failed_checks} health checks ({stage.health_url})")
+            else:
+                stage.failed_checks = 0
+                continue
+            if not ok:
+                return False
+        return True
+
+    def run(self):
+        """Supervise until stop() or a stage that can't be kept running; returns an exit code."""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stop())
+        code = 0
+        while not self.stopping:
+            if not self.check():
+                code = 1
+                break
+            time.sleep(self.config["health_interval"])
+        self.shutdown()
+        return code
+
+    def stop(self):
+        self.stopping = True
+
+    def shutdown(self):
+        print("\n⏹️ Stopping all programs...")
+        running = [s for s in self.stages if s.process and s.process.poll() is None]
+        for stage in running:
+            stage.process.send_signal(signal.SIGINT)
+        deadline = time.monotonic() + self.config["shutdown_grace"]
+        for stage in running:
+            try:
+                stage.process.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                print(f"⚠️ {stage.prog} didn't exit in time; terminating")
+                self._kill(stage)
+        for stage in self.stages:
+            if stage.restarts:
+                print(f"🔁 {stage.prog} was restarted {stage.restarts} times")
@@ -0,0 +1,65 @@
+import time
+
+import numpy as np
+
+from audio_buffer import AudioBuffer
+
+
+def blocks(buffer, count, size=100, start=0):
+    """Write `count` blocks whose samples count up from `start`; returns the next value."""
+    for i in range(count):
+        buffer.write(np.arange(start + i * size, start + (i + 1) * size, dtype=np.float32))
+    return start + count * size
+
+
+def test_write_and_view():
+    buffer = AudioBuffer(sample_rate=100, max_seconds=10)
+    blocks(buffer, 3)
+    assert len(buffer) == 300
+    assert np.array_equal(buffer.view(), np.arange(300, dtype=np.float32))
+    assert buffer.view().flags["C_CONTIGUOUS"]
+    assert buffer.dropped == 0 and buffer.overflow_samples == 0
+
+
+def test_overflow_drops_oldest_audio_and_tracks_offset():
+    buffer = AudioBuffer(sample_rate=100, max_seconds=10, drop_fraction=0.1)   # 1000 samples, drops 100
+    end = blocks(buffer, 11)
+    assert len(buffer) == 1000
+    assert buffer.dropped == 100
+    assert buffer.overflow_events == 1
+    view = buffer.view()
+    # The view starts at recording position `dropped`
+    assert view[0] == buffer.dropped and view[-1] == end - 1
+
+
+def test_compaction_keeps_contents_and_earlier_views():
+    buffer = AudioBuffer(sample_rate=100, max_seconds=10, drop_fraction=0.1)   # capacity 1200
+    end = blocks(buffer, 5)
+    held = buffer.view()
+    before = held.copy()
+    end = blocks(buffer, 30, start=end)
+    deadline = time.monotonic() + 2.0
+    while buffer.compactions == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    end = blocks(buffer, 30, start=end)
+
+    assert buffer.compactions >= 1
+    view = buffer.view()
+    assert len(view) <= buffer.max_samples
+    assert np.array_equal(view, np.arange(buffer.dropped, end, dtype=np.float32))
+    assert np.array_equal(held, before)
+
+
+def test_clear_starts_over():
+    buffer = AudioBuffer(sample_rate=100, max_seconds=10)
+    blocks(buffer, 20)
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.dropped == 0
+    blocks(buffer, 1, start=5)
+    assert np.array_equal(buffer.view(), np.arange(5, 105, dtype=np.float32))
+
+
+def test_block_longer_than_limit_keeps_its_tail():
+    buffer = AudioBuffer(sample_rate=100, max_seconds=1)
+    buffer.write(np.arange(250, dtype=np.int16))
+    assert np.array_equal(buffer.view(), np.arange(150, 250, dtype=np.float32))
@@ -0,0 +1,80 @@
+import threading
+import time
+from multiprocessing.connection import Client
+
+import pytest
+
+import bus
+
+
+@pytest.fixture
+def receiver(tmp_path, monkeypatch):
+    monkeypatch.setenv("COACH_BUS_DIR", str(tmp_path))
+    monkeypatch.setenv("COACH_BUS_KEY", "test")
+    rx = bus.BusReceiver(bus.TRANSCRIPT, maxsize=1)
+    yield rx
+    rx.close()
+
+
+def raw_send(msg):
+    """Send on a fresh connection, like a sender that reconnected, and return the ack."""
+    conn = Client(bus._address(bus.TRANSCRIPT), family="AF_UNIX", authkey=bus._authkey())
+    try:
+        conn.send(msg)
+        return conn.recv()
+    finally:
+        conn.close()
+
+
+def test_send_and_receive(receiver):
+    sender = bus.BusSender(bus.TRANSCRIPT, connect_timeout=1.0)
+    sender.send(bus.TRANSCRIPT, "hello", turn="t1")
+    msg = receiver.get(timeout=1.0)
+    assert (msg.text, msg.seq, msg.meta) == ("hello", 1, {"turn": "t1"})
+    assert receiver.get(timeout=0.05) is None
+
+
+def test_resend_after_reconnect_is_deduplicated(receiver):
+    msg = bus.TurnMessage(kind=bus.TRANSCRIPT, text="once", seq=1, sender="s")
+    assert raw_send(msg) == 1
+    assert raw_send(msg) == 1   # acked again, so the sender stops resending
+    assert receiver.get(timeout=1.0).text == "once"
+    assert receiver.get(timeout=0.05) is None
+
+    # Sequence numbers are tracked per sender
+    raw_send(bus.TurnMessage(kind=bus.TRANSCRIPT, text="other", seq=1, sender="t"))
+    assert receiver.get(timeout=1.0).text == "other"
+
+
+def test_sender_reconnects_after_dropped_connection(receiver):
+    sender = bus.BusSender(bus.TRANSCRIPT, connect_timeout=1.0)
+    sender.send(bus.TRANSCRIPT, "first")
+    assert receiver.get(timeout=1.0).text == "first"
+
+    sender._conn.close()
+    sender.send(bus.TRANSCRIPT, "second")
+    msg = receiver.get(timeout=1.0)
+    assert (msg.text, msg.seq) == ("second", 2)
+
+
+def test_full_queue_blocks_the_sender(receiver):
+    sender = bus.BusSender(bus.TRANSCRIPT, connect_timeout=1.0)
+    sender.send(bus.TRANSCRIPT, "queued")
+    blocked = threading.Thread(target=sender.send, args=(bus.TRANSCRIPT, "waiting"), daemon=True)
+    blocked.start()
+    time.sleep(0.2)
+    assert blocked.is_alive()
+
+    assert receiver.get(timeout=1.0).text == "queued"
+    blocked.join(1.0)
+    assert not blocked.is_alive()
+    assert receiver.get(timeout=1.0).text == "waiting"
+
+
+def test_connect_timeout_without_receiver(tmp_path, monkeypatch):
+    monkeypatch.setenv("COACH_BUS_DIR", str(tmp_path))
+    sender = bus.BusSender(bus.TRANSCRIPT, connect_timeout=0.2)
+    start = time.monotonic()
+    with pytest.raises(OSError):
+        sender.send(bus.TRANSCRIPT, "nobody home")
+    assert time.monotonic() - start < 1.0
@@ -0,0 +1,61 @@
+import time
+
+from context import ManagedChat
+from fake_llm import FakeClient
+from text_utils import SentenceStream
+
+SUMMARY_DELAY = 0.5
+
+
+def slow_summary_client():
+    """Instant replies; the summary call (a plain string prompt) takes SUMMARY_DELAY."""
+    client = FakeClient(first_token_delay=0, token_delay=0)
+    reply = client.models.generate_content
+
+    def generate_content(model=None, contents=None, config=None):
+        if isinstance(contents, str):
+            time.sleep(SUMMARY_DELAY)
+        return reply(model, contents, config)
+
+    client.models.generate_content = generate_content
+    return client
+
+
+def make_chat(client, **options):
+    return ManagedChat(client, "model", {"system_instruction": "Interview."}, token_budget=20, keep_recent=1, **options)
+
+
+def last_sentence_delay(chat, message):
+    """Seconds from the start of a streamed reply until its final (flushed) sentence is available."""
+    stream = SentenceStream()
+    start = time.perf_counter()
+    for chunk in chat.send_message_stream(message):
+        stream.feed(chunk.text)
+    assert stream.flush()
+    return time.perf_counter() - start
+
+
+def test_compaction_does_not_delay_the_reply():
+    chat = make_chat(slow_summary_client())
+    for i in range(3):
+        assert last_sentence_delay(chat, f"A long answer number {i} " * 5) < SUMMARY_DELAY / 2
+        assert chat.history_tokens() > chat.token_budget   # not compacted yet
+        chat.compact()
+    assert chat.summary
+    assert len(chat.turns) == 1
+
+
+def test_window_policy_drops_old_turns():
+    chat = make_chat(FakeClient(first_token_delay=0, token_delay=0), policy="window")
+    for i in range(3):
+        chat.send_message(f"Answer {i} " * 10)
+        chat.compact()
+    assert chat.summary == ""
+    assert [u for u, _ in chat.turns] == ["Answer 2 " * 10]
+
+
+def test_record_partial_keeps_what_was_heard():
+    chat = make_chat(FakeClient(first_token_delay=0, token_delay=0))
+    chat.record_partial("My answer.", "Tell me more about")
+    assert chat.turns == [("My answer.", "Tell me more about")]
+    assert chat.prompt_tokens
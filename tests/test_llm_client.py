@@ -0,0 +1,181 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from llm_client import CircuitBreaker, CircuitOpen, LLMUnavailable, ResilientClient
+
+
+class APIError(Exception):
+    def __init__(self, code):
+        super().__init__(f"HTTP {code}")
+        self.code = code
+
+
+class StubClient:
+    """Blocking client whose calls follow a script: a delay in seconds, or an exception to raise."""
+
+    def __init__(self, *script, default=0.0):
+        self.script = list(script)
+        self.default = default
+        self.calls = 0
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, model=None, contents=None, config=None):
+        self.calls += 1
+        step = self.script.pop(0) if self.script else self.default
+        if isinstance(step, Exception):
+            raise step
+        time.sleep(step)
+        return SimpleNamespace(text=f"reply {self.calls}")
+
+
+class AsyncStream:
+    def __init__(self, chunks, first_delay):
+        self.chunks = list(chunks)
+        self.first_delay = first_delay
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.first_delay:
+            await asyncio.sleep(self.first_delay)
+            self.first_delay = 0
+        if not self.chunks:
+            raise StopAsyncIteration
+        return SimpleNamespace(text=self.chunks.pop(0))
+
+    async def aclose(self):
+        self.closed = True
+
+
+class AsyncStubClient:
+    """Client with `aio` streams; the n-th stream waits first_delays[n] before its first chunk."""
+
+    def __init__(self, *first_delays):
+        self.first_delays = list(first_delays)
+        self.streams = []
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content_stream=self.generate_content_stream))
+
+    async def generate_content_stream(self, **kwargs):
+        stream = AsyncStream(["Tell me ", "about yourself."], self.first_delays.pop(0) if self.first_delays else 0)
+        self.streams.append(stream)
+        return stream
+
+
+def make(client, **options):
+    options = {"backoff": 0.01, "hedge": False, **options}
+    return ResilientClient(client, **options)
+
+
+def test_retries_transient_errors():
+    stub = StubClient(APIError(503), 0.0)
+    client = make(stub)
+    assert client.generate_content(contents="hi").text == "reply 2"
+    assert client.stats["retries"] == 1
+    assert client.breaker.state == "closed"
+
+
+def test_client_errors_are_not_retried():
+    stub = StubClient(APIError(400))
+    client = make(stub)
+    with pytest.raises(APIError):
+        client.generate_content(contents="hi")
+    assert stub.calls == 1
+
+
+def test_deadline_bounds_the_whole_request():
+    client = make(StubClient(default=1.0), deadline=0.3, attempt_timeout=0.2, retries=5)
+    start = time.monotonic()
+    with pytest.raises(LLMUnavailable):
+        client.generate_content(contents="hi")
+    assert time.monotonic() - start < 0.6
+    assert client.stats["timeouts"] >= 1
+
+
+def test_slow_attempt_is_hedged():
+    stub = StubClient(1.0, 0.0)
+    client = make(stub, hedge=True, hedge_min_samples=5, hedge_floor=0.05)
+    client._latencies["full"].extend([0.05] * 5)
+    start = time.monotonic()
+    assert client.generate_content(contents="hi").text == "reply 2"
+    assert time.monotonic() - start < 0.5
+    assert client.stats["hedges"] == 1
+    assert client.stats["hedge_wins"] == 1
+
+
+def test_no_hedge_until_enough_samples():
+    client = make(StubClient(), hedge=True, hedge_min_samples=5)
+    client._latencies["full"].extend([0.05] * 4)
+    assert client.hedge_delay("full") is None
+    client._latencies["full"].append(0.05)
+    assert client.hedge_delay("full") == pytest.approx(client.hedge_floor)
+
+
+def test_hedged_stream_closes_the_loser():
+    stub = AsyncStubClient(1.0, 0.0)
+    client = make(stub, hedge=True, hedge_min_samples=5, hedge_floor=0.05)
+    client._latencies["first_chunk"].extend([0.05] * 5)
+    chunks = [c.text for c in client.generate_content_stream(contents="hi")]
+    assert chunks == ["Tell me ", "about yourself."]
+    assert client.stats["hedge_wins"] == 1
+    assert len(stub.streams) == 2
+    assert all(s.closed for s in stub.streams)
+
+
+def test_stream_deadline_after_first_chunk():
+    class Dribble(AsyncStubClient):
+        async def generate_content_stream(self, **kwargs):
+            stream = await super().generate_content_stream(**kwargs)
+            original = stream.__anext__
+            calls = []
+
+            async def slow_next():
+                calls.append(1)
+                if len(calls) > 1:
+                    await asyncio.sleep(1.0)
+                return await original()
+
+            stream.__anext__ = slow_next
+            return stream
+
+    stub = Dribble()
+    client = make(stub, deadline=0.3, attempt_timeout=0.2)
+    received = []
+    with pytest.raises(LLMUnavailable):
+        for chunk in client.generate_content_stream(contents="hi"):
+            received.append(chunk.text)
+    assert received == ["Tell me "]
+    assert stub.streams[0].closed
+
+
+def test_breaker_opens_and_recovers():
+    stub = StubClient(default=APIError(503))
+    client = make(stub, retries=0, breaker_failures=2, breaker_cooldown=0.2)
+    for _ in range(2):
+        with pytest.raises(LLMUnavailable):
+            client.generate_content(contents="hi")
+    with pytest.raises(CircuitOpen):
+        client.generate_content(contents="hi")
+    assert stub.calls == 2
+    assert client.stats["short_circuits"] == 1
+
+    # After the cooldown one trial goes through; it succeeds and closes the circuit
+    time.sleep(0.25)
+    stub.default = 0.0
+    assert client.generate_content(contents="hi").text == "reply 3"
+    assert client.breaker.state == "closed"
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = CircuitBreaker(failures=3, cooldown=0.0)
+    for _ in range(3):
+        breaker.failure()
+    assert breaker.state == "open"
+    assert breaker.allow()
+    assert breaker.state == "half-open"
+    breaker.failure()   # a single failure while half-open is enough
+    assert breaker.state == "open"
@@ -0,0 +1,66 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import tracing
+from scheduler import SchedulerBusy, TranscriptionScheduler
+
+
+class BlockingModel:
+    """Returns the audio length as the only segment once `release` is set."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.order = []
+
+    def transcribe(self, audio, **options):
+        self.release.wait(5)
+        self.order.append(len(audio))
+        return iter([len(audio)]), None
+
+
+def test_results_come_back():
+    model = BlockingModel()
+    model.release.set()
+    scheduler = TranscriptionScheduler(model, num_workers=2)
+    assert scheduler.transcribe(np.zeros(5), timeout=2) == ([5], None)
+
+
+def test_full_queue_rejects_requests():
+    model = BlockingModel()
+    scheduler = TranscriptionScheduler(model, num_workers=2, max_batch=4, max_queue=2, batch_window=0.0)
+    futures = []
+    with pytest.raises(SchedulerBusy):
+        for n in range(20):
+            futures.append(scheduler.submit(np.zeros(n + 1)))
+            time.sleep(0.02)
+    # Running + held by the dispatcher + queued
+    assert 2 + 2 <= len(futures) <= 2 + 4 + 2
+
+    model.release.set()
+    assert sorted(f.result(2)[0][0] for f in futures) == list(range(1, len(futures) + 1))
+
+
+def test_batch_runs_shortest_first():
+    model = BlockingModel()
+    scheduler = TranscriptionScheduler(model, num_workers=1, max_batch=4, max_queue=8, batch_window=0.1)
+    first = scheduler.submit(np.zeros(1))   # occupies the only worker
+    time.sleep(0.2)
+    rest = [scheduler.submit(np.zeros(n)) for n in (30, 10, 20)]
+    time.sleep(0.2)
+    model.release.set()
+    for f in [first] + rest:
+        f.result(2)
+    assert model.order == [1, 10, 20, 30]
+
+
+def test_queue_wait_is_recorded():
+    model = BlockingModel()
+    model.release.set()
+    scheduler = TranscriptionScheduler(model)
+    before = tracing._histograms.get("transcribe_queue_wait")
+    count = before.count if before else 0
+    scheduler.transcribe(np.zeros(1), timeout=2)
+    assert tracing._histograms["transcribe_queue_wait"].count == count + 1
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from streaming import StreamingTranscriber
+
+RATE = 10   # samples per second; every second of audio is one word
+
+
+class WordModel:
+    """Transcribes each second of audio as the word "w<value of its first sample>"."""
+
+    def __init__(self):
+        self.decoded = []   # the audio of every decode
+
+    def transcribe(self, audio, initial_prompt=None, **options):
+        self.decoded.append(np.array(audio))
+        segments = []
+        for i in range(0, len(audio), RATE):
+            end = min(i + RATE, len(audio)) / RATE
+            segments.append(SimpleNamespace(text=f"w{int(audio[i])}", end=end))
+        return segments, None
+
+
+def recording(seconds):
+    return np.repeat(np.arange(seconds, dtype=np.float32), RATE)
+
+
+def test_agreed_segments_are_committed_and_not_decoded_again():
+    model = WordModel()
+    t = StreamingTranscriber(model, sample_rate=RATE)
+    assert t.update(recording(3)) == "w0\nw1\nw2"
+    t.update(recording(4))   # w0..w2 agree with the last pass
+    t.update(recording(5))
+    assert model.decoded[-1][0] == 3   # only the uncommitted audio from second 3 on
+    assert t.finalize(recording(6)) == "w0\nw1\nw2\nw3\nw4\nw5"
+    assert model.decoded[-1][0] == 4
+
+
+def test_short_tail_is_not_decoded():
+    model = WordModel()
+    t = StreamingTranscriber(model, sample_rate=RATE)
+    assert t.update(recording(1)[:5]) == ""
+    assert model.decoded == []
+
+
+def test_offset_after_dropped_audio():
+    model = WordModel()
+    t = StreamingTranscriber(model, sample_rate=RATE)
+    t.update(recording(3))
+    t.update(recording(4))   # commits up to second 3
+    # The buffer dropped its first 2 seconds: audio[0] is now recording second 2
+    t.update(recording(6)[2 * RATE:], offset=2 * RATE)
+    assert model.decoded[-1][0] == 3
+    # Dropped past the committed point: decode everything that is left
+    t.update(recording(9)[8 * RATE:], offset=8 * RATE)
+    assert model.decoded[-1][0] == 8
+
+
+def test_update_after_finalize():
+    t = StreamingTranscriber(WordModel(), sample_rate=RATE)
+    text = t.finalize(recording(2))
+    assert t.update(recording(3)) is None
+    assert t.finalize(recording(3)) == text
+    t.reset()
+    assert t.update(recording(2)) == "w0\nw1"
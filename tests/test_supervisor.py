@@ -0,0 +1,44 @@
+import pytest
+
+import supervisor
+
+PROGRAMS = ["app.py", "tts.py", "file_chat.py"]
+SHIPPED = {"app.py": {"share": 0.5}, "tts.py": {"share": 0.375}, "file_chat.py": {"share": 0.125, "threads": 1}}
+
+
+@pytest.mark.parametrize("cores", [3, 4, 5, 6, 8, 12, 16, 64])
+def test_shares_are_disjoint(cores):
+    cfg = supervisor.load_config()
+    cfg["stages"] = SHIPPED
+    budgets = supervisor.plan(cfg, PROGRAMS, list(range(cores)))
+    sets = [b["cpus"] for b in budgets.values()]
+    assert all(sets)
+    assert sum(len(s) for s in sets) == len(set().union(*sets)) <= cores
+    assert budgets["file_chat.py"]["threads"] == 1
+
+
+def test_fewer_cores_than_stages_wrap_around():
+    cfg = supervisor.load_config()
+    cfg["stages"] = SHIPPED
+    budgets = supervisor.plan(cfg, PROGRAMS, [0, 1])
+    assert all(len(b["cpus"]) == 1 for b in budgets.values())
+
+
+def test_explicit_cpus_are_left_out_of_the_shares():
+    cfg = supervisor.load_config()
+    cfg["stages"] = {"app.py": {"cpus": "0-1"}, "tts.py": {"share": 1.0}}
+    budgets = supervisor.plan(cfg, PROGRAMS, list(range(4)))
+    assert budgets["app.py"] == {"cpus": {0, 1}, "threads": 2}
+    assert budgets["tts.py"]["cpus"] == {2, 3}
+    assert budgets["file_chat.py"] is None
+
+
+def test_stage_env_sets_thread_budget():
+    env = supervisor.stage_env({"PATH": "/bin"}, "app.py", {"cpus": {0, 1}, "threads": 2})
+    assert env["OMP_NUM_THREADS"] == "2"
+    assert env["COACH_WHISPER_THREADS"] == "2"
+    assert supervisor.stage_env({"PATH": "/bin"}, "app.py", None) == {"PATH": "/bin"}
+
+
+def test_parse_cpus():
+    assert supervisor.parse_cpus("0-3, 6") == {0, 1, 2, 3, 6}
@@ -0,0 +1,39 @@
+from text_utils import SentenceStream, clean_text, split_sentences
+
+
+def stream(text, chunk=3):
+    s = SentenceStream()
+    out = []
+    for i in range(0, len(text), chunk):
+        out += s.feed(text[i:i + chunk])
+    return out, s.flush()
+
+
+def test_abbreviations_do_not_end_a_sentence():
+    sentences, rest = stream("Dr. Smith said e.g. this works, i.e. it scales. Next question please. ")
+    assert sentences == ["Dr. Smith said e.g. this works, i.e. it scales.", "Next question please."]
+    assert rest == []
+
+
+def test_short_sentences_wait_for_the_next_one():
+    sentences, rest = stream("Okay. Thanks. Tell me about your last project. Why? ")
+    assert sentences == ["Okay. Thanks. Tell me about your last project."]
+    assert rest == ["Why?"]
+
+
+def test_flush_returns_the_unfinished_tail():
+    sentences, rest = stream("Tell me about yourself. And your goals")
+    assert sentences == ["Tell me about yourself."]
+    assert rest == ["And your goals"]
+
+
+def test_split_sentences_merges_and_splits():
+    assert split_sentences("Mr. Jones is here to see you. Okay. What do you think of that?") == [
+        "Mr. Jones is here to see you.", "Okay. What do you think of that?"
+    ]
+    long = ", ".join(["a clause of some length"] * 20) + "."
+    assert all(len(p) <= 200 for p in split_sentences(long))
+
+
+def test_clean_text():
+    assert clean_text('Use "AI/ML" (carefully)\nnow') == "Use AI and ML carefully now"
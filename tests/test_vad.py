@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from vad import VoiceActivityDetector
+
+RATE = 16000
+BLOCK = RATE // 10   # 0.1 s, like app.py's capture blocks
+rng = np.random.default_rng(0)
+
+
+def noise(seconds, level=0.001):
+    return rng.normal(0, level, int(seconds * RATE)).astype(np.float32)
+
+
+def speech(seconds):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def feed(vad, audio, block=BLOCK):
+    kept, voiced = [], False
+    for start in range(0, len(audio), block):
+        out, s = vad.process(audio[start:start + block])
+        kept.append(out)
+        voiced |= s
+    return np.concatenate(kept), voiced
+
+
+def test_silence_is_dropped():
+    vad = VoiceActivityDetector(RATE)
+    kept, voiced = feed(vad, noise(1.0))
+    assert not voiced and len(kept) == 0
+    assert vad.dropped_samples == RATE
+
+
+def test_long_pause_is_trimmed():
+    vad = VoiceActivityDetector(RATE, keep_silence=0.3, pad=0.2)
+    feed(vad, noise(0.5))
+    vad.reset()
+    audio = np.concatenate([speech(0.5), noise(2.0), speech(0.5)])
+    kept, voiced = feed(vad, audio)
+    assert voiced
+    assert len(kept) + vad.dropped_samples == len(audio)
+    # The 2 s pause keeps 0.3 s after the first word and 0.2 s of lead-in before the second
+    assert len(kept) / RATE == pytest.approx(1.0 + 0.3 + 0.2, abs=0.05)
+
+
+def test_pre_roll_across_block_boundary():
+    vad = VoiceActivityDetector(RATE, pad=0.2)
+    feed(vad, noise(1.0))
+    kept, voiced = vad.process(speech(0.1))
+    assert voiced
+    assert len(kept) == BLOCK + int(0.2 * RATE)
+
+
+def test_endpoint_after_long_enough_pause():
+    vad = VoiceActivityDetector(RATE, endpoint_silence=0.5)
+    feed(vad, noise(0.5))
+    vad.reset()
+    feed(vad, np.concatenate([speech(0.5), noise(0.3)]))
+    assert not vad.endpoint
+    feed(vad, noise(0.3))
+    assert vad.endpoint
+
+
+def test_no_endpoint_without_speech():
+    vad = VoiceActivityDetector(RATE, endpoint_silence=0.5)
+    feed(vad, noise(2.0))
+    assert not vad.speech_seen and not vad.endpoint
+
+
+def test_noise_floor_rises_at_the_same_rate_for_any_block_size():
+    floors = []
+    for block in (BLOCK // 5, BLOCK, BLOCK * 5):
+        vad = VoiceActivityDetector(RATE)
+        feed(vad, noise(0.5, level=0.001), block)
+        feed(vad, noise(2.0, level=0.004), block)
+        floors.append(vad.noise_db)
+    assert max(floors) - min(floors) < 1.0
@@ -0,0 +1,97 @@
+# text_utils.py
+import re
+
+# A period after these doesn't end a sentence ("Dr. Smith", "e.g. this")
+ABBREVIATIONS = ("Mr", "Mrs", "Ms", "Dr", "Prof", "Sr", "Jr", "vs", "etc", "e.g", "i.e")
+_SENTENCE_END = re.compile(
+    "".join(rf"(?<!\b{re.escape(a)}\.)" for a in ABBREVIATIONS) + r"(?<=[.!?])\s+", re.IGNORECASE
+)
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def clean_text(text):
+    """Clean text for TTS compatibility"""
+    text = text.replace("AI/ML", "AI and ML")
+    text = re.sub(r"[\[\]\(\)\{\}<>]", "", text)  # remove brackets/parentheses
+    text = text.replace("/", " and ")  # general slash replacement
+    text = text.replace('"', "")       # remove quotes
+    text = text.replace("—", "-")      # normalize dashes
+    text = text.replace("\n", " ")     # merge multiple lines
+    text = re.sub(r"\s+", " ", text).strip()  # collapse multiple spaces
+    return text
+
+
+def split_sentences(text, min_chars=20, max_chars=200):
+    """Split text into sentence-sized pieces for incremental synthesis.
+
+    Fragments shorter than `min_chars` ("Okay.") are merged into the next
+    sentence, and sentences longer than `max_chars` are split at clause
+    punctuation so the first audio is never held up by one long sentence.
+    """
+    pieces = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        clause = ""
+        for part in _CLAUSE_END.split(sentence):
+            if clause and len(clause) + len(part) + 1 > max_chars:
+                pieces.append(clause)
+                clause = part
+            else:
+                clause = f"{clause} {part}" if clause else part
+        if clause:
+            pieces.append(clause)
+
+    merged = []
+    carry = ""
+    for piece in pieces:
+        piece = f"{carry} {piece}" if carry else piece
+        if len(piece) < min_chars:
+            carry = piece
+        else:
+            merged.append(piece)
+            carry = ""
+    if carry:
+        if merged:
+            merged[-1] = f"{merged[-1]} {carry}"
+        else:
+            merged.append(carry)
+    return [p for p in merged if p.strip()]
+
+
+class SentenceStream:
+    """Turns a stream of LLM text chunks into cleaned, complete sentences.
+
+    A sentence is only released once whitespace follows its closing
+    punctuation, so clean_text never sees half a sentence. Sentences
+    shorter than `min_chars` ("Okay.") are held back and sent together
+    with the next one, as split_sentences() does for whole replies.
+    """
+
+    def __init__(self, min_chars=20):
+        self.min_chars = min_chars
+        self._buffer = ""
+        self._short = ""   # completed but too short to send on its own
+
+    def feed(self, chunk):
+        """Add a chunk and return the cleaned sentences it completed."""
+        self._buffer += chunk
+        parts = _SENTENCE_END.split(self._buffer)
+        self._buffer = parts.pop()
+        sentences = []
+        for part in parts:
+            sentence = clean_text(f"{self._short} {part}")
+            if len(sentence) < self.min_chars:
+                self._short = sentence
+            else:
+                sentences.append(sentence)
+                self._short = ""
+        return sentences
+
+    def flush(self):
+        """Return whatever is left once the stream has ended."""
+        rest = clean_text(f"{self._short} {self._buffer}")
+        self._buffer = ""
+        self._short = ""
+        return [rest] if rest else []
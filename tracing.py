@@ -0,0 +1,186 @@
+# tracing.py
+"""Per-turn spans and latency histograms shared by the three processes.
+
+Every turn gets a trace id in app.py that travels with the bus messages, so
+spans recorded in app.py, file_chat.py and tts.py can be lined up. Each
+process dumps its histograms and recent traces to metrics/<stage>.json;
+this module's CLI merges the dumps:
+
+    python tracing.py                 # print a summary table
+    python tracing.py --serve 9100    # http://127.0.0.1:9100/metrics
+"""
+import argparse
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+METRICS_DIR = os.environ.get("COACH_METRICS_DIR", "metrics")
+DUMP_INTERVAL = float(os.environ.get("COACH_METRICS_INTERVAL", "10"))
+MAX_SAMPLES = 2048   # recent values kept per histogram for percentiles
+MAX_TRACES = 50      # recent traces kept per process
+
+_stage = "unknown"
+_lock = threading.Lock()
+_histograms = {}
+_traces = OrderedDict()
+
+
+def new_trace_id():
+    return uuid.uuid4().hex[:12]
+
+
+class Histogram:
+    """Count/sum/min/max over all values plus percentiles over recent ones."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.recent = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def snapshot(self):
+        values = np.asarray(self.recent, dtype=np.float64)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+        }
+
+
+def record(name, value, trace_id=None):
+    """Add a value (seconds, ratio, count) to the `name` histogram."""
+    with _lock:
+        _histograms.setdefault(name, Histogram()).add(value)
+        if trace_id:
+            spans = _traces.setdefault(trace_id, [])
+            spans.append({"stage": _stage, "name": name, "value": round(value, 4), "t": time.time()})
+            _traces.move_to_end(trace_id)
+            while len(_traces) > MAX_TRACES:
+                _traces.popitem(last=False)
+
+
+@contextmanager
+def span(name, trace_id=None, audio_seconds=None):
+    """Time a block as `name`; with `audio_seconds`, also record its real-time factor."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        record(name, elapsed, trace_id)
+        if audio_seconds:
+            record(f"{name}_rtf", elapsed / audio_seconds, trace_id)
+            record(f"{name}_audio_seconds", audio_seconds)
+
+
+def snapshot():
+    with _lock:
+        return {
+            "stage": _stage,
+            "pid": os.getpid(),
+            "updated": time.time(),
+            "histograms": {name: h.snapshot() for name, h in _histograms.items()},
+            "traces": {tid: list(spans) for tid, spans in _traces.items()},
+        }
+
+
+def dump(path=None):
+    path = path or os.path.join(METRICS_DIR, f"{_stage}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp, path)
+
+
+def init(stage):
+    """Name this process and start dumping its metrics periodically."""
+    global _stage
+    _stage = stage
+
+    def loop():
+        while True:
+            time.sleep(DUMP_INTERVAL)
+            try:
+                dump()
+            except OSError as e:
+                print(f"⚠️ Could not write metrics: {e}")
+
+    threading.Thread(target=loop, daemon=True).start()
+
+
+# ----------------- Aggregation (CLI) -----------------
+def collect(metrics_dir=METRICS_DIR):
+    """Merge every process dump into one report, with traces joined by id."""
+    report = {"stages": {}, "traces": {}}
+    for path in sorted(glob.glob(os.path.join(metrics_dir, "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        report["stages"][data["stage"]] = data["histograms"]
+        for tid, spans in data["traces"].items():
+            report["traces"].setdefault(tid, []).extend(spans)
+    for spans in report["traces"].values():
+        spans.sort(key=lambda s: s["t"])
+    return report
+
+
+def print_summary(report):
+    print(f"{'stage':<10}{'metric':<30}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for stage, histograms in report["stages"].items():
+        for name, h in sorted(histograms.items()):
+            print(f"{stage:<10}{name:<30}{h['count']:>7}{h['p50']:>10.3f}{h['p95']:>10.3f}{h['p99']:>10.3f}")
+
+
+def serve(port, metrics_dir=METRICS_DIR):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            body = json.dumps(collect(metrics_dir), indent=2).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    print(f"📈 Metrics at http://127.0.0.1:{port}/metrics")
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize or serve pipeline metrics")
+    parser.add_argument("--dir", default=METRICS_DIR, help="directory with the per-process dumps")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="serve merged metrics as JSON")
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.dir)
+    else:
+        print_summary(collect(args.dir))
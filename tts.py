@@ -1,62 +1,246 @@
 # tts.py
 import time
 import os
-from TTS.api import TTS
-import pygame
+import sys
+import queue
+import collections
+import threading
+import numpy as np
+import bus
+import tracing
+import readiness
+from text_utils import split_sentences
+from tts_cache import AudioCache
+from playback import PlaybackEngine
+from tts_backend import DEFAULT_BACKEND, DEFAULT_THREADS, Synthesizer
+
+# Offline stand-ins for benchmarking: skip the Coqui model and/or the speakers
+STUB_MODEL = os.environ.get("COACH_TTS_STUB", "") not in ("", "0")
+NULL_AUDIO = os.environ.get("COACH_NULL_AUDIO", "") not in ("", "0")
+STUB_SECONDS_PER_CHAR = 0.004   # stub synthesis time
+STUB_AUDIO_PER_CHAR = 0.06      # stub speech length
+USE_CACHE = os.environ.get("COACH_TTS_CACHE", "1") != "0"
+
+# Inference backend (see tts_backend.py): torch / onnx / int8, or COACH_TTS_BACKEND
+TTS_BACKEND = DEFAULT_BACKEND
+TTS_THREADS = DEFAULT_THREADS   # 0 = library default, or COACH_TTS_THREADS
 
 # Model setup
 model_name = "tts_models/en/ljspeech/vits"
-tts = TTS(model_name=model_name, gpu=False)  # CPU mode
+load_start = time.perf_counter()
+if STUB_MODEL:
+    print("🧪 Using stub TTS model (COACH_TTS_STUB)")
+    tts = None
+    sample_rate = 22050
+else:
+    tts = Synthesizer(model_name, backend=TTS_BACKEND, threads=TTS_THREADS)
+    sample_rate = tts.sample_rate
+    print(f"🔊 TTS backend: {tts.describe()}")
+load_time = time.perf_counter() - load_start
 
-# Input (from Gemini/chat output) and Output (speech file)
+# Input (from Gemini/chat output)
 input_file = "chat_output.txt"
-audio_file = "coqui_output_fast.wav"
-
-# Initialize pygame mixer for audio playback
-pygame.mixer.init()
-
-last_mtime = None
-
-
-def play_audio(file_path):
-    """Play audio using pygame mixer"""
-    try:
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play()
-        # Wait until audio finishes playing
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
-        print(f"✅ Played: {file_path}")
-    except Exception as e:
-        print(f"⚠️ Error playing audio: {e}")
-
-
-print("🔄 Watching for changes in chat_output.txt ...")
-while True:
-    try:
-        if os.path.exists(input_file):
-            mtime = os.path.getmtime(input_file)
-            if last_mtime is None:
-                last_mtime = mtime
-
-            if mtime != last_mtime:  # File has changed
-                with open(input_file, "r") as f:
-                    text = f.read().strip()
-
-                last_mtime = mtime
-
-                if text:
-                    print(f"🎤 Synthesizing: {text}")
-                    
-                    # Generate speech
-                    tts.tts_to_file(text=text, file_path=audio_file)
-                    
-                    # Play audio
-                    play_audio(audio_file)
-
-        time.sleep(0.5)
-
-    except KeyboardInterrupt:
-        print("⏹️ Stopped by user.")
-        pygame.mixer.quit()
-        break
+
+# Synthesized audio cache and the phrases pre-synthesized at startup
+# Optimized backends sound slightly different, so they get their own cache entries
+if STUB_MODEL:
+    cache_model = "stub"
+elif tts.backend == "torch":
+    cache_model = model_name
+else:
+    cache_model = f"{model_name}:{tts.backend}"
+cache = AudioCache(
+    cache_model, cache_dir="tts_cache", max_memory_mb=64, max_disk_mb=512
+)
+warmup_bank = "question_bank.txt"
+synth_lock = threading.Lock()  # the model is not safe to call from two threads
+
+# Playback: a dedicated output stream, so barge-in can cut a reply mid-sentence
+PLAYBACK_BLOCK_MS = 10   # audio handed to the device per callback (bounds cancel latency)
+BARGE_IN = True          # stop talking when the candidate starts speaking (bus mode only)
+
+
+def synthesize(text, trace_id=None):
+    """Synthesize one sentence to int16 PCM, using the cache when possible"""
+    pcm = cache.get(text) if USE_CACHE else None
+    if pcm is not None:
+        tracing.record("tts_cache_hit", 1, trace_id)
+        return pcm
+    start = time.perf_counter()
+    with synth_lock:
+        if STUB_MODEL:
+            time.sleep(len(text) * STUB_SECONDS_PER_CHAR)
+            wav = np.zeros(int(len(text) * STUB_AUDIO_PER_CHAR * sample_rate), dtype=np.float32)
+        else:
+            wav = tts.synthesize(text)
+    pcm = (np.clip(wav, -1.0, 1.0) * 32767).astype(np.int16)
+    elapsed = time.perf_counter() - start
+    tracing.record("synthesize", elapsed, trace_id)
+    if len(pcm):
+        tracing.record("synthesize_rtf", elapsed / (len(pcm) / sample_rate), trace_id)
+    if USE_CACHE:
+        cache.put(text, pcm)
+    return pcm
+
+
+def load_bank(path):
+    """Phrases from a question bank file (one per line, # for comments)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def warm_up(path, idle=None):
+    """Pre-synthesize every sentence in the question bank that isn't cached yet.
+
+    If `idle` is given, wait for it to return True before each phrase so
+    warm-up never delays a real reply.
+    """
+    sentences = [s for phrase in load_bank(path) for s in split_sentences(phrase)]
+    todo = [s for s in sentences if s not in cache]
+    start = time.perf_counter()
+    for sentence in todo:
+        while idle is not None and not idle():
+            time.sleep(0.2)
+        synthesize(sentence)
+    print(f"🔥 Warm-up: {len(todo)} of {len(sentences)} phrases synthesized in {time.perf_counter() - start:.1f}s")
+
+
+class SpeechPipeline:
+    """Synthesizes sentence N+1 while sentence N is playing.
+
+    cancel() silences the interviewer: playback stops at the next audio block,
+    queued sentences are dropped, and later sentences of the same replies
+    are ignored when they arrive.
+    """
+
+    def __init__(self, player, max_pending=2):
+        self.player = player
+        self.text_queue = queue.Queue()
+        self.audio_queue = queue.Queue(maxsize=max_pending)
+        self._seen = collections.deque(maxlen=64)    # turns spoken recently
+        self._muted = collections.deque(maxlen=64)   # turns cut off by cancel()
+        threading.Thread(target=self._synth_loop, daemon=True).start()
+        threading.Thread(target=self._play_loop, daemon=True).start()
+
+    def speak(self, text, turn=None, index=0):
+        """Queue a reply (or one sentence of it); returns immediately."""
+        if turn is not None and turn in self._muted:
+            return
+        if turn is not None and turn not in self._seen:
+            self._seen.append(turn)
+        pieces = split_sentences(text)
+        for i, sentence in enumerate(pieces):
+            # Timing events only for the first and last piece of each message
+            self.text_queue.put((sentence, turn, index, i == 0, i == len(pieces) - 1))
+
+    def _synth_loop(self):
+        while True:
+            sentence, turn, index, first, last = self.text_queue.get()
+            try:
+                if turn is not None and turn in self._muted:
+                    continue
+                print(f"🎤 Speaking: {sentence}")
+                pcm = synthesize(sentence, turn)
+                if first:
+                    bus.emit_event("synthesized", turn, index=index)
+                self.audio_queue.put((sentence, pcm, turn, index, first, last))
+            except Exception as e:
+                print(f"⚠️ Error synthesizing audio: {e}")
+            finally:
+                self.text_queue.task_done()
+
+    def _play_loop(self):
+        while True:
+            sentence, pcm, turn, index, first, last = self.audio_queue.get()
+            try:
+                if turn is not None and turn in self._muted:
+                    continue
+                if first:
+                    bus.emit_event("play_start", turn, index=index)
+                with tracing.span("play", turn, audio_seconds=len(pcm) / sample_rate):
+                    finished = self.player.play(pcm).wait()
+                if not finished:
+                    print(f"✂️ Interrupted: {sentence}")
+                    continue
+                if last:
+                    bus.emit_event("played", turn, index=index)
+                print(f"✅ Played: {sentence}")
+            finally:
+                self.audio_queue.task_done()
+
+    def cancel(self):
+        """Stop speaking now and drop everything queued for the replies heard so far."""
+        self._muted.extend(t for t in self._seen if t not in self._muted)
+        for q in (self.text_queue, self.audio_queue):
+            while True:
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    break
+                q.task_done()
+        return self.player.cancel()
+
+    def idle(self):
+        return self.text_queue.empty() and self.audio_queue.empty() and not self.player.busy
+
+
+def warm_start():
+    """Run one uncached synthesis so the first reply doesn't pay for lazy initialization"""
+    start = time.perf_counter()
+    with synth_lock:
+        if not STUB_MODEL:
+            tts.synthesize("Hello, let's begin.")
+    readiness.mark_ready("tts", load=load_time, warmup=time.perf_counter() - start)
+
+
+def listen_for_barge_in(pipeline):
+    """Cancel playback whenever app.py hears the candidate start speaking."""
+    control = bus.BusReceiver(bus.CONTROL, maxsize=32)
+    while True:
+        msg = control.get()
+        if msg is None or msg.text != "cancel":
+            continue
+        cut = pipeline.cancel()
+        latency = time.time() - msg.meta.get("t", time.time())
+        tracing.record("barge_in", latency, msg.meta.get("turn"))
+        if cut:
+            print(f"🛑 Barge-in: stopped speaking ({latency * 1000:.0f} ms after speech was detected)")
+
+
+def main():
+    receiver = bus.open_receiver(bus.REPLY, input_file, poll_interval=0.5)
+    warm_start()
+    player = PlaybackEngine(sample_rate, block_ms=PLAYBACK_BLOCK_MS, null=NULL_AUDIO)
+    pipeline = SpeechPipeline(player)
+    if BARGE_IN and bus.bus_enabled():
+        threading.Thread(target=listen_for_barge_in, args=(pipeline,), daemon=True).start()
+    if USE_CACHE:
+        threading.Thread(target=warm_up, args=(warmup_bank, pipeline.idle), daemon=True).start()
+
+    print("🔄 Waiting for replies ...")
+    while True:
+        try:
+            msg = receiver.get(timeout=0.5)
+            if msg is None or not msg.text:
+                continue
+
+            pipeline.speak(msg.text, msg.meta.get("turn"), msg.meta.get("index", 0))
+
+        except KeyboardInterrupt:
+            print("⏹️ Stopped by user.")
+            receiver.close()
+            player.close()
+            break
+
+
+if __name__ == "__main__":
+    tracing.init("tts")
+    if "--warmup" in sys.argv:
+        # python tts.py --warmup [question_bank.txt]: fill the cache and exit
+        args = sys.argv[sys.argv.index("--warmup") + 1:]
+        warm_up(args[0] if args else warmup_bank)
+    else:
+        main()
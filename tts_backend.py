@@ -0,0 +1,112 @@
+# tts_backend.py
+import contextlib
+import os
+
+import numpy as np
+
+# "torch": full-precision PyTorch (the original path)
+# "onnx":  the model exported once to ONNX and run with onnxruntime (optional dependency)
+# "int8":  that ONNX graph with its Conv/MatMul weights quantized to int8 (VITS is all
+#          Conv1d, which torch's dynamic quantization doesn't cover)
+BACKENDS = ("torch", "onnx", "int8")
+DEFAULT_BACKEND = os.environ.get("COACH_TTS_BACKEND", "torch")
+DEFAULT_THREADS = int(os.environ.get("COACH_TTS_THREADS", "0"))   # 0 = library default
+ONNX_DIR = "tts_onnx"
+PROBE_TEXT = "Tell me about a project you are proud of."
+
+
+class Synthesizer:
+    """A Coqui TTS model behind a single synthesize(text) -> float32 samples call.
+
+    With an optimized `backend`, the model is converted at load time and
+    checked on a probe sentence; if either step fails (and `fallback` is
+    set), it goes back to the full-precision model and records why in
+    `fallback_reason`. `threads` sets the intra-op thread count and
+    `inference_mode` runs synthesis under torch.inference_mode().
+    """
+
+    def __init__(self, model_name, backend=DEFAULT_BACKEND, threads=DEFAULT_THREADS, inference_mode=True, fallback=True):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown TTS backend: {backend} (choose from {', '.join(BACKENDS)})")
+        import torch
+        from TTS.api import TTS
+
+        self.torch = torch
+        if threads:
+            torch.set_num_threads(threads)
+        self.model_name = model_name
+        self.threads = torch.get_num_threads()
+        self.inference_mode = inference_mode
+        self.tts = TTS(model_name=model_name, gpu=False)  # CPU mode
+        self.sample_rate = self.tts.synthesizer.output_sample_rate
+        self._fp32 = self.tts.synthesizer.tts_model
+        self._onnx = None
+        self.backend = "torch"
+        self.requested = backend
+        self.fallback_reason = None
+
+        if backend != "torch":
+            try:
+                getattr(self, f"_load_{backend}")()
+                self.backend = backend
+                self._check(self.synthesize(PROBE_TEXT))
+            except Exception as e:
+                if not fallback:
+                    raise
+                self.fallback_reason = f"{type(e).__name__}: {e}"
+                print(f"⚠️ {backend} TTS backend unavailable ({self.fallback_reason}); using full-precision PyTorch")
+                self.tts.synthesizer.tts_model = self._fp32
+                self._onnx = None
+                self.backend = "torch"
+
+    def _export_onnx(self):
+        path = os.path.join(ONNX_DIR, self.model_name.replace("/", "--") + ".onnx")
+        if not os.path.exists(path):
+            os.makedirs(ONNX_DIR, exist_ok=True)
+            print(f"📦 Exporting {self.model_name} to {path} (first run only)")
+            self._fp32.export_onnx(output_path=path, verbose=False)
+        return path
+
+    def _open_onnx(self, path):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._onnx = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def _load_onnx(self):
+        self._open_onnx(self._export_onnx())
+
+    def _load_int8(self):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        path = self._export_onnx()
+        quantized = path[: -len(".onnx")] + ".int8.onnx"
+        if not os.path.exists(quantized):
+            print(f"📦 Quantizing {path} to int8 (first run only)")
+            # Conv -> ConvInteger and MatMul -> MatMulInteger; ConvTranspose stays float
+            quantize_dynamic(path, quantized, op_types_to_quantize=["Conv", "MatMul"], weight_type=QuantType.QUInt8)
+        self._open_onnx(quantized)
+
+    @staticmethod
+    def _check(wav):
+        if not len(wav) or not np.isfinite(wav).all() or np.abs(wav).max() < 1e-3:
+            raise RuntimeError("probe sentence came out empty or silent")
+
+    def synthesize(self, text):
+        """Synthesize `text` (one sentence) to float32 samples at `sample_rate`."""
+        mode = self.torch.inference_mode() if self.inference_mode else contextlib.nullcontext()
+        with mode:
+            if self._onnx is not None:
+                model = self._fp32
+                model.onnx_sess = self._onnx
+                ids = np.asarray(model.tokenizer.text_to_ids(text), dtype=np.int64)[None, :]
+                wav = model.inference_onnx(ids)
+            else:
+                wav = self.tts.tts(text=text)
+        return np.asarray(wav, dtype=np.float32).reshape(-1)
+
+    def describe(self):
+        name = self.backend if self.backend == self.requested else f"{self.backend} (fallback from {self.requested})"
+        return f"{name}, {self.threads} threads, inference_mode={'on' if self.inference_mode else 'off'}"
@@ -0,0 +1,107 @@
+# tts_cache.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from text_utils import clean_text
+
+
+class AudioCache:
+    """Synthesized speech cache: in-memory LRU in front of an on-disk store.
+
+    Entries are keyed by the model name and the clean_text() output (case
+    kept: the phonemizer reads "IT" and "it" differently), and stored as int16 PCM. Both tiers evict least-recently-used
+    entries once they exceed their byte budget.
+    """
+
+    def __init__(self, model_name, cache_dir="tts_cache", max_memory_mb=64, max_disk_mb=512):
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._disk_bytes = sum(e.stat().st_size for e in os.scandir(cache_dir) if e.name.endswith(".npy"))
+
+    def key(self, text):
+        normalized = clean_text(text)
+        return hashlib.sha256(f"{self.model_name}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def get(self, text):
+        """Cached int16 PCM for `text`, or None."""
+        key = self.key(text)
+        with self._lock:
+            pcm = self._memory.get(key)
+            if pcm is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return pcm
+        path = self._path(key)
+        try:
+            pcm = np.load(path)
+            os.utime(path)  # keep recently used files away from eviction
+        except (FileNotFoundError, ValueError, OSError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, pcm)
+        return pcm
+
+    def put(self, text, pcm):
+        key = self.key(text)
+        with self._lock:
+            self._remember(key, pcm)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, pcm)
+        existed = os.path.exists(path)
+        os.replace(tmp, path)
+        if not existed:
+            with self._lock:
+                self._disk_bytes += os.path.getsize(path)
+            self._evict_disk()
+
+    def __contains__(self, text):
+        key = self.key(text)
+        return key in self._memory or os.path.exists(self._path(key))
+
+    def _remember(self, key, pcm):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = pcm
+        self._memory_bytes += pcm.nbytes
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_bytes -= old.nbytes
+
+    def _evict_disk(self):
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+        entries = sorted(
+            (e for e in os.scandir(self.cache_dir) if e.name.endswith(".npy")),
+            key=lambda e: e.stat().st_mtime,
+        )
+        for entry in entries:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                self._disk_bytes -= size
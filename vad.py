@@ -0,0 +1,99 @@
+# vad.py
+import numpy as np
+
+NOISE_RISE = 0.1   # fraction of the gap the noise floor closes per second when the room gets louder
+
+
+class VoiceActivityDetector:
+    """Energy-based voice activity detection over capture blocks.
+
+    Each block is cut into `frame_ms` frames and classified in one numpy
+    pass against an adaptive noise floor. process() returns only the audio
+    worth transcribing: speech, `pad` seconds of context on either side,
+    and at most `keep_silence` seconds of every pause. After `min_speech`
+    seconds of speech, a pause of `endpoint_silence` seconds sets
+    `endpoint`, meaning the answer is over.
+    """
+
+    def __init__(self, sample_rate=16000, frame_ms=20, margin_db=12.0, min_db=-55.0,
+                 pad=0.2, keep_silence=0.3, min_speech=0.25, endpoint_silence=0.0):
+        self.sample_rate = sample_rate
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.margin_db = margin_db
+        self.min_db = min_db
+        self.pad_frames = int(pad * 1000 / frame_ms)
+        self.keep_frames = max(int(keep_silence * 1000 / frame_ms), self.pad_frames)
+        self.min_speech_frames = int(min_speech * 1000 / frame_ms)
+        self.endpoint_frames = int(endpoint_silence * 1000 / frame_ms)
+        self.noise_db = None   # set from the first block
+        self.reset()
+
+    def reset(self):
+        """Start a new answer (the noise floor is kept)."""
+        self.silence_frames = 10 ** 9   # silent frames since the last speech frame
+        self.speech_frames = 0
+        self.endpoint = False
+        self.dropped_samples = 0
+        self._tail = np.zeros(0, dtype=np.float32)   # dropped audio at the end of the last block
+
+    @property
+    def speech_seen(self):
+        return self.speech_frames >= self.min_speech_frames
+
+    def frame_levels(self, block):
+        """RMS level in dBFS of each frame (the last frame may be partial)."""
+        n = len(block)
+        frames = -(-n // self.frame)
+        padded = np.zeros(frames * self.frame, dtype=np.float32)
+        padded[:n] = block
+        power = np.square(padded.reshape(frames, self.frame)).mean(axis=1)
+        return 10.0 * np.log10(power + 1e-12)
+
+    def process(self, block):
+        """Classify a block; return (samples to keep, whether it contained speech)."""
+        n = len(block)
+        if n == 0:
+            return block, False
+        levels = self.frame_levels(block)
+
+        # Track the noise floor: fall immediately, rise slowly (at the same rate whatever the block size)
+        quiet = float(np.percentile(levels, 10))
+        if self.noise_db is None or quiet < self.noise_db:
+            self.noise_db = quiet
+        else:
+            self.noise_db += (1.0 - (1.0 - NOISE_RISE) ** (n / self.sample_rate)) * (quiet - self.noise_db)
+        speech = levels > max(self.noise_db + self.margin_db, self.min_db)
+
+        idx = np.arange(len(levels))
+        # Frames since the last speech frame, continuing the run from the previous block
+        last = np.maximum.accumulate(np.where(speech, idx, -1 - min(self.silence_frames, 10 ** 6)))
+        since = idx - last
+        # Frames until the next speech frame in this block
+        nxt = np.minimum.accumulate(np.where(speech, idx, 10 ** 9)[::-1])[::-1]
+        until = nxt - idx
+
+        keep_frames = (since <= self.keep_frames) | (until <= self.pad_frames)
+        keep = np.repeat(keep_frames, self.frame)[:n]
+        kept = block[keep]
+
+        # Pre-roll from the previous block when speech starts right at the boundary
+        restored = 0
+        if speech.any():
+            missing = (self.pad_frames - int(idx[speech][0])) * self.frame
+            if missing > 0 and len(self._tail):
+                restored = min(missing, len(self._tail))
+                kept = np.concatenate([self._tail[-restored:], kept])
+        kept_at = np.flatnonzero(keep)
+        if len(kept_at):
+            trailing = block[kept_at[-1] + 1:]
+        else:
+            # Nothing kept: the dropped run continues from the last block (the pad may span several blocks)
+            trailing = np.concatenate([self._tail, block])
+        self._tail = np.asarray(trailing[max(len(trailing) - self.pad_frames * self.frame, 0):], dtype=np.float32)
+
+        self.dropped_samples += n - len(kept_at) - restored
+        self.speech_frames += int(speech.sum())
+        self.silence_frames = int(since[-1])
+        if self.endpoint_frames and self.speech_seen and self.silence_frames >= self.endpoint_frames:
+            self.endpoint = True
+        return kept, bool(speech.any())